@@ -1,6 +1,7 @@
 import streamlit as st
 
 from helpers.session import init_state
+from helpers.staging import sweep_at_startup
 from ui.styles       import inject_css
 from ui.login        import screen_login
 from ui.dashboard    import screen_dashboard
@@ -16,6 +17,7 @@ def main() -> None:
     )
     inject_css()
     init_state()
+    sweep_at_startup()
 
     if not st.session_state.logged_in:
         screen_login()
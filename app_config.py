@@ -1,11 +1,18 @@
+import os
+
 import streamlit as st
 from pathlib import Path
 
 BASE_DIR         = Path(__file__).parent
 DATA_DIR         = BASE_DIR / "data"
 INBOX_DIR        = DATA_DIR / "inbox"
-STAGING_DIR      = DATA_DIR / "staging"
-PUBLIC_KEYS_FILE = DATA_DIR / "public_keys.json"
+# Per-send workspaces; point STEGO_STAGING_DIR at a tmpfs (e.g. /dev/shm/stego)
+# to keep staged images in RAM
+STAGING_DIR      = Path(os.environ.get("STEGO_STAGING_DIR", DATA_DIR / "staging"))
+PUBLIC_KEYS_FILE = DATA_DIR / "public_keys.json"   # legacy registry, migrated once
+PUBLIC_KEYS_DB   = DATA_DIR / "public_keys.db"
+# Cover library scanned by src/stego/cover_catalog.py (index kept inside it)
+COVERS_DIR       = Path(os.environ.get("STEGO_COVERS_DIR", DATA_DIR / "covers"))
 
 USERS: dict[str, str] = dict(st.secrets["users"])
 
@@ -19,3 +26,25 @@ for _u in USERS:
 STAGING_DIR.mkdir(parents=True, exist_ok=True)
 
 ENC_SEQ_ID_LEN: int = 12
+
+# Worker processes used to embed / extract stego images in parallel (1 = in-process)
+STEGO_WORKERS: int = min(4, os.cpu_count() or 1)
+
+# Cipher suite for outgoing messages (see src/crypto/suites.py):
+#   "tri-hybrid" (default), "chacha20-poly1305" or "aes-256-gcm"
+CIPHER_SUITE: str = "tri-hybrid"
+
+# Workers for chunk-parallel encryption / decryption (1 = serial). "process"
+# spreads the pure-Python ASCON layer over cores; "thread" is enough for the
+# pycryptodome-only suites; "auto" picks by the message's cipher suite.
+CRYPTO_WORKERS: int = min(4, os.cpu_count() or 1)
+CRYPTO_POOL: str = "auto"
+
+# Default key encapsulation for new keypairs: "x25519" (fast ECIES) or "rsa-2048"
+DEFAULT_KEM: str = "x25519"
+
+# RSA-2048 keypairs kept pre-generated by a background worker process (0 = off)
+RSA_POOL_SIZE: int = 2
+
+# Staging workspaces untouched for this long are deleted at startup
+STAGING_TTL_S: float = 6 * 60 * 60
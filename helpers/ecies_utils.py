@@ -0,0 +1,82 @@
+from Crypto.Cipher        import ChaCha20_Poly1305
+from Crypto.Hash          import SHA256
+from Crypto.Protocol.DH   import key_agreement, import_x25519_public_key
+from Crypto.Protocol.KDF  import HKDF
+from Crypto.PublicKey     import ECC
+
+KEM_X25519  = "x25519"
+CURVE       = "Curve25519"
+EPH_PUB_LEN = 32
+TAG_LEN     = 16
+_HKDF_INFO  = b"distributed-stego x25519 key blob"
+# The wrapping key is fresh for every ephemeral key, so a fixed nonce is safe
+_NONCE      = bytes(12)
+
+
+def generate_x25519_keypair() -> tuple:
+    """
+    Generate a fresh X25519 keypair (a few milliseconds, unlike RSA-2048).
+    Returns:
+        (private_key_obj, public_pem_str)
+    """
+    key = ECC.generate(curve=CURVE)
+    return key, key.public_key().export_key(format="PEM")
+
+
+def _wrapping_key(shared: bytes, eph_pub: bytes, recipient_pub: bytes) -> bytes:
+    return HKDF(shared, 32, eph_pub + recipient_pub, SHA256, context=_HKDF_INFO)
+
+
+def x25519_encrypt_sym_keys(
+    inner: bytes,
+    outer: bytes,
+    ctr:   bytes,
+    pub_pem: str,
+    associated_data: bytes = b"",
+) -> bytes:
+    """
+    ECIES: X25519 with an ephemeral key + HKDF-SHA256, then
+    ChaCha20-Poly1305 over the 64-byte key blob.
+
+    Layout: ephemeral_pub(32) + encrypted blob(64) + tag(16) = 112 bytes
+    """
+    recipient = ECC.import_key(pub_pem)
+    ephemeral = ECC.generate(curve=CURVE)
+    eph_pub   = ephemeral.public_key().export_key(format="raw")
+    recipient_pub = recipient.export_key(format="raw")
+    key = key_agreement(
+        static_pub=recipient, eph_priv=ephemeral,
+        kdf=lambda shared: _wrapping_key(shared, eph_pub, recipient_pub),
+    )
+    cipher = ChaCha20_Poly1305.new(key=key, nonce=_NONCE)
+    cipher.update(associated_data)
+    ciphertext, tag = cipher.encrypt_and_digest(inner + outer + ctr)
+    return eph_pub + ciphertext + tag
+
+
+def x25519_decrypt_sym_keys(
+    enc_blob: bytes,
+    priv_key,
+    associated_data: bytes = b"",
+) -> tuple[bytes, bytes, bytes]:
+    """
+    Reverse x25519_encrypt_sym_keys and unpack the 3 symmetric keys.
+
+    Returns:
+        (inner_key, outer_key, ctr_key)
+    Raises:
+        ValueError: if the blob is malformed or fails authentication.
+    """
+    if len(enc_blob) != EPH_PUB_LEN + 64 + TAG_LEN:
+        raise ValueError("X25519 key blob has the wrong length.")
+    eph_pub, body = enc_blob[:EPH_PUB_LEN], enc_blob[EPH_PUB_LEN:]
+    ephemeral = import_x25519_public_key(eph_pub)
+    recipient_pub = priv_key.public_key().export_key(format="raw")
+    key = key_agreement(
+        static_priv=priv_key, eph_pub=ephemeral,
+        kdf=lambda shared: _wrapping_key(shared, eph_pub, recipient_pub),
+    )
+    cipher = ChaCha20_Poly1305.new(key=key, nonce=_NONCE)
+    cipher.update(associated_data)
+    blob = cipher.decrypt_and_verify(body[:-TAG_LEN], body[-TAG_LEN:])
+    return blob[0:32], blob[32:48], blob[48:64]
@@ -1,12 +1,255 @@
-from app_config import INBOX_DIR
+import json
+import os
+import secrets
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib    import Path
+
+from app_config       import INBOX_DIR
+from src.utils.bundle import BundleReader, BundleWriter, KEYS_MEMBER, stego_member
+
+# Per-user inbox layout:
+#   INBOX_DIR/<user>/index.json         {"messages": [manifest, ...]}, oldest first
+#   INBOX_DIR/<user>/<msg_id>.sgb       message bundle: stego_*.png + keys.bin
+#                                       (see src/utils/bundle.py)
+# A single message from before the queue (keys.bin and stego_*.png at the
+# inbox root) is packed into a bundle the first time the inbox is listed.
+# index.json is the only file read to list messages or check for new mail;
+# it is rewritten atomically (temp file + os.replace) under an O_EXCL lock.
+# Bundles are assembled under INCOMING_DIR (same filesystem) and renamed
+# into place before the index mentions them, so readers never see a
+# partial delivery.
+INDEX_FILE    = "index.json"
+KEYS_FILE     = "keys.bin"
+LOCK_FILE     = ".index.lock"
+INCOMING_DIR  = ".incoming"
+BUNDLE_SUFFIX = ".sgb"
+
+LOCK_TIMEOUT_S = 10.0
+LOCK_STALE_S   = 30.0
+
+# Users whose inbox has been checked for a pre-queue message in this process;
+# nothing writes the old layout any more, so one check per user is enough.
+_migrated: set[str] = set()
+
+
+def _inbox(username: str) -> Path:
+    return INBOX_DIR / username
+
+
+@contextmanager
+def _index_lock(username: str):
+    """Exclusive lock on a user's index, held by creating LOCK_FILE with O_EXCL."""
+    lock     = _inbox(username) / LOCK_FILE
+    deadline = time.monotonic() + LOCK_TIMEOUT_S
+    while True:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock.stat().st_mtime > LOCK_STALE_S:
+                    lock.unlink(missing_ok=True)   # left behind by a crashed writer
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Inbox of {username} is locked.")
+            time.sleep(0.01)
+    try:
+        os.close(fd)
+        yield
+    finally:
+        lock.unlink(missing_ok=True)
+
+
+def _read_index(username: str) -> list[dict]:
+    try:
+        return json.loads((_inbox(username) / INDEX_FILE).read_text())["messages"]
+    except FileNotFoundError:
+        return []
+
+
+def _write_index(username: str, messages: list[dict]) -> None:
+    index = _inbox(username) / INDEX_FILE
+    tmp   = index.with_name(f"{INDEX_FILE}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"messages": messages}, indent=2))
+    os.replace(tmp, index)
+
+
+def _migrate_legacy(username: str) -> None:
+    """
+    Pack a pre-queue single message (keys.bin at the inbox root) into a
+    bundle. Runs once per user and process.
+    """
+    if username in _migrated:
+        return
+    inbox = _inbox(username)
+    if (inbox / KEYS_FILE).exists():
+        with _index_lock(username):
+            if (inbox / KEYS_FILE).exists():
+                stego_paths = sorted(inbox.glob("stego_*.png"), key=lambda p: int(p.stem.split("_")[1]))
+                manifest    = _build_bundle(username, None, stego_paths, (inbox / KEYS_FILE).read_bytes())
+                _write_index(username, _read_index(username) + [manifest])
+                for path in [inbox / KEYS_FILE, *stego_paths]:
+                    path.unlink(missing_ok=True)
+    _migrated.add(username)
+
+
+def _new_message_id() -> str:
+    return f"{time.time_ns() // 1_000_000:013d}-{secrets.token_hex(4)}"
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Hardlink src to dst (O(1), no data copied); copy across filesystems."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _incoming_path(username: str, msg_id: str) -> Path:
+    incoming = _inbox(username) / INCOMING_DIR
+    incoming.mkdir(parents=True, exist_ok=True)
+    return incoming / f"{msg_id}{BUNDLE_SUFFIX}"
+
+
+def _publish(username: str, sender: str | None, msg_id: str, build: Path, suite: str | None = None) -> dict:
+    """
+    Rename a finished bundle from INCOMING_DIR into the inbox; returns its
+    manifest. suite is the sender's cipher suite name, shown before reveal.
+    """
+    try:
+        with BundleReader(build) as reader:
+            images = reader.stego_names()
+            sizes  = {name: reader.size(name) for name in images}
+        manifest = {
+            "id":        msg_id,
+            "sender":    sender,
+            "timestamp": time.time(),
+            "images":    len(images),
+            "sizes":     sizes,
+            "bundle":    build.name,
+        }
+        if suite is not None:
+            manifest["suite"] = suite
+        os.rename(build, _inbox(username) / build.name)
+    except BaseException:
+        build.unlink(missing_ok=True)
+        raise
+    return manifest
+
+
+def _enqueue(username: str, manifest: dict) -> None:
+    """Append a published bundle to the index; on failure the bundle is deleted again."""
+    try:
+        with _index_lock(username):
+            _write_index(username, _read_index(username) + [manifest])
+    except BaseException:
+        (_inbox(username) / manifest["bundle"]).unlink(missing_ok=True)
+        raise
+
+
+def _build_bundle(username: str, sender: str | None, stego_paths: list, key_blob: bytes) -> dict:
+    msg_id = _new_message_id()
+    build  = _incoming_path(username, msg_id)
+    with BundleWriter(build) as writer:
+        for index, path in enumerate(stego_paths):
+            writer.add(stego_member(index), Path(path).read_bytes())
+        writer.add(KEYS_MEMBER, key_blob)
+    return _publish(username, sender, msg_id, build)
+
+
+def deliver_bundle(recipient: str, sender: str, bundle_path, suite: str | None = None) -> str:
+    """
+    Queue an already-built message bundle in recipient's inbox. The bundle
+    is hardlinked (O(1), no data copied) and published with one rename.
+    Returns:
+        The new message ID.
+    """
+    msg_id = _new_message_id()
+    build  = _incoming_path(recipient, msg_id)
+    _link_or_copy(Path(bundle_path), build)
+    _enqueue(recipient, _publish(recipient, sender, msg_id, build, suite))
+    return msg_id
+
+
+@contextmanager
+def open_delivery(recipient: str, sender: str, suite: str | None = None):
+    """
+    Write a message bundle straight into recipient's inbox. Yields
+    (msg_id, BundleWriter); members are written in place under INCOMING_DIR
+    (no staging copy) and the message is published with one rename when the
+    block exits cleanly. On any error, including a failed publish or index
+    write, the bundle is deleted and nothing is queued.
+    """
+    msg_id = _new_message_id()
+    build  = _incoming_path(recipient, msg_id)
+    writer = BundleWriter(build)
+    try:
+        yield msg_id, writer
+        writer.close(fsync=True)
+    except BaseException:
+        writer.abort()
+        raise
+    _enqueue(recipient, _publish(recipient, sender, msg_id, build, suite))
+
+
+def deliver_message(recipient: str, sender: str, stego_paths: list, key_blob: bytes) -> str:
+    """
+    Pack stego-images and the key blob into a bundle and queue it in
+    recipient's inbox next to any unread messages.
+    Returns:
+        The new message ID.
+    """
+    manifest = _build_bundle(recipient, sender, stego_paths, key_blob)
+    _enqueue(recipient, manifest)
+    return manifest["id"]
+
+
+def list_messages(username: str) -> list[dict]:
+    """Return the manifests of all queued messages, oldest first."""
+    _migrate_legacy(username)
+    return _read_index(username)
 
 
 def inbox_has_message(username: str) -> bool:
-    """Return True when a sender has deposited a sealed message."""
-    return (INBOX_DIR / username / "keys.bin").exists()
+    """Return True when at least one sealed message is waiting."""
+    return bool(list_messages(username))
+
+
+def _find(username: str, msg_id: str) -> dict:
+    for manifest in _read_index(username):
+        if manifest["id"] == msg_id:
+            return manifest
+    raise KeyError(f"No message {msg_id} in {username}'s inbox.")
+
+
+def message_manifest(username: str, msg_id: str) -> dict:
+    """Return the manifest of one queued message."""
+    return _find(username, msg_id)
+
+
+def open_message(username: str, msg_id: str):
+    """
+    Open one queued message for reading: a BundleReader (names(),
+    stego_names(), read(name), close()) over its single bundle file.
+    """
+    return BundleReader(_inbox(username) / _find(username, msg_id)["bundle"])
+
+
+def clear_message(username: str, msg_id: str) -> None:
+    """Delete one message after it has been read."""
+    with _index_lock(username):
+        messages = _read_index(username)
+        removed  = [m for m in messages if m["id"] == msg_id]
+        _write_index(username, [m for m in messages if m["id"] != msg_id])
+    for manifest in removed:
+        (_inbox(username) / manifest["bundle"]).unlink(missing_ok=True)
 
 
 def clear_inbox(username: str) -> None:
-    """Delete all files from the user's inbox after they have read the message."""
-    for f in (INBOX_DIR / username).iterdir():
-        f.unlink(missing_ok=True)
+    """Delete every queued message."""
+    for manifest in list_messages(username):
+        clear_message(username, manifest["id"])
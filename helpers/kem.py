@@ -0,0 +1,102 @@
+from Crypto.PublicKey import ECC
+
+from app_config          import RSA_POOL_SIZE
+from helpers.rsa_utils   import KEM_RSA, generate_rsa_keypair, rsa_encrypt_sym_keys, rsa_decrypt_sym_keys
+from helpers.keypool     import get_key_pool
+from helpers.ecies_utils import (
+    KEM_X25519, generate_x25519_keypair, x25519_encrypt_sym_keys, x25519_decrypt_sym_keys,
+)
+
+KEM_LABELS: dict[str, str] = {
+    KEM_RSA:    "RSA-2048",
+    KEM_X25519: "X25519",
+}
+
+# keys.bin layout: KEYS_MAGIC(3) + kem_id(1) + KEM-specific blob.
+# A bare 256-byte blob (no header) is a legacy RSA-2048 OAEP ciphertext;
+# headed blobs are never 256 bytes long, so the two cannot be confused.
+KEYS_MAGIC      = b"KEM"
+KEYS_HEADER_LEN = 4
+LEGACY_RSA_BLOB_LEN = 256
+_KEM_IDS: dict[str, int] = {KEM_RSA: 1, KEM_X25519: 2}
+
+
+def _keys_header(kem: str) -> bytes:
+    if kem not in _KEM_IDS:
+        raise ValueError(f"Unknown KEM: {kem}")
+    return KEYS_MAGIC + bytes([_KEM_IDS[kem]])
+
+
+def generate_keypair(kem: str) -> tuple:
+    """
+    Generate a keypair for the given KEM. RSA keypairs come from the
+    background pool when RSA_POOL_SIZE > 0.
+    Returns:
+        (private_key_obj, public_pem_str)
+    """
+    if kem == KEM_X25519:
+        return generate_x25519_keypair()
+    if kem == KEM_RSA:
+        return get_key_pool().take() if RSA_POOL_SIZE > 0 else generate_rsa_keypair()
+    raise ValueError(f"Unknown KEM: {kem}")
+
+
+def private_key_kem(priv_key) -> str:
+    """Return the KEM a private key object belongs to."""
+    return KEM_X25519 if isinstance(priv_key, ECC.EccKey) else KEM_RSA
+
+
+def blob_kem(enc_blob: bytes) -> str:
+    """Return the KEM that produced a keys.bin blob."""
+    if len(enc_blob) == LEGACY_RSA_BLOB_LEN:
+        return KEM_RSA
+    if len(enc_blob) > KEYS_HEADER_LEN and enc_blob[:3] == KEYS_MAGIC:
+        for kem, kem_id in _KEM_IDS.items():
+            if enc_blob[3] == kem_id:
+                return kem
+    raise ValueError("keys.bin is corrupted or uses an unknown KEM.")
+
+
+def encapsulate_sym_keys(
+    inner: bytes,
+    outer: bytes,
+    ctr:   bytes,
+    pub_pem: str,
+    kem: str = KEM_RSA,
+    username: str = "",
+) -> bytes:
+    """
+    Wrap the 3 symmetric keys for the recipient's public key with the given
+    KEM. The result (header + KEM blob) is written as keys.bin. username
+    (the recipient) scopes the parsed-key cache of the RSA path.
+    """
+    header = _keys_header(kem)
+    if kem == KEM_X25519:
+        return header + x25519_encrypt_sym_keys(inner, outer, ctr, pub_pem, associated_data=header)
+    return header + rsa_encrypt_sym_keys(inner, outer, ctr, pub_pem, username)
+
+
+def decapsulate_sym_keys(
+    enc_blob: bytes,
+    priv_key,
+) -> tuple[bytes, bytes, bytes]:
+    """
+    Unwrap a keys.bin blob (either KEM, or a legacy RSA blob) with the
+    recipient's private key.
+
+    Returns:
+        (inner_key, outer_key, ctr_key)
+    """
+    kem = blob_kem(enc_blob)
+    if kem != private_key_kem(priv_key):
+        raise ValueError(
+            f"Message was sealed with {KEM_LABELS[kem]}, "
+            f"but your key is {KEM_LABELS[private_key_kem(priv_key)]}."
+        )
+    if len(enc_blob) == LEGACY_RSA_BLOB_LEN:
+        return rsa_decrypt_sym_keys(enc_blob, priv_key)
+
+    header, blob = enc_blob[:KEYS_HEADER_LEN], enc_blob[KEYS_HEADER_LEN:]
+    if kem == KEM_X25519:
+        return x25519_decrypt_sym_keys(blob, priv_key, associated_data=header)
+    return rsa_decrypt_sym_keys(blob, priv_key)
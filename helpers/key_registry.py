@@ -0,0 +1,163 @@
+import json
+import sqlite3
+import threading
+import time
+
+from app_config import PUBLIC_KEYS_DB, PUBLIC_KEYS_FILE
+
+# Every published key is kept as a new version; lookups return the latest.
+# The generation counter in `meta` is bumped on every write, so readers can
+# tell cheaply whether their cached view of the registry is stale.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS public_keys (
+    username   TEXT    NOT NULL,
+    version    INTEGER NOT NULL,
+    kem        TEXT    NOT NULL,
+    pem        TEXT    NOT NULL,
+    created_at REAL    NOT NULL,
+    PRIMARY KEY (username, version)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+BUSY_TIMEOUT_S = 10.0
+
+_local = threading.local()
+
+# Schema setup, WAL mode and the JSON import run once per process (per
+# database path); Streamlit reruns each start on a fresh thread, so doing
+# them per connection would take a write lock on every rerun.
+_setup_lock = threading.Lock()
+_setup_done: set[str] = set()
+
+
+def _setup(conn: sqlite3.Connection) -> None:
+    key = str(PUBLIC_KEYS_DB)
+    with _setup_lock:
+        if key in _setup_done:
+            return
+        conn.execute("PRAGMA journal_mode=WAL")    # persistent: stored in the database file
+        conn.executescript(_SCHEMA)
+        _migrate_json(conn)
+        _setup_done.add(key)
+
+
+def _connect() -> sqlite3.Connection:
+    """One connection per thread (sqlite3 connections are not shareable)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(PUBLIC_KEYS_DB, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _setup(conn)
+        _local.conn = conn
+    return conn
+
+
+def _bump_generation(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES ('generation', '1') "
+        "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+    )
+
+
+def _migrate_json(conn: sqlite3.Connection) -> None:
+    """One-time import of the legacy public_keys.json (bare PEM or {kem, pem} entries)."""
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+        return    # plain read: no write lock once the import has happened
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        done = conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone()
+        if not done:
+            legacy = json.loads(PUBLIC_KEYS_FILE.read_text()) if PUBLIC_KEYS_FILE.exists() else {}
+            for user, entry in legacy.items():
+                if not isinstance(entry, dict):
+                    entry = {"kem": "rsa-2048", "pem": entry}   # rsa_utils.KEM_RSA
+                _insert(conn, user, entry["kem"], entry["pem"])
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', '1')")
+            _bump_generation(conn)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _insert(conn: sqlite3.Connection, username: str, kem: str, pem: str) -> int:
+    (version,) = conn.execute(
+        "SELECT COALESCE(MAX(version), 0) + 1 FROM public_keys WHERE username = ?", (username,)
+    ).fetchone()
+    conn.execute(
+        "INSERT INTO public_keys (username, version, kem, pem, created_at) VALUES (?, ?, ?, ?, ?)",
+        (username, version, kem, pem, time.time()),
+    )
+    return version
+
+
+def registry_generation() -> int:
+    """Counter that changes whenever any key is published."""
+    row = _connect().execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def publish_key(username: str, kem: str, pem: str) -> int:
+    """
+    Store a new key version for username in one write transaction
+    (concurrent publishers are serialized by SQLite, none is lost).
+    Returns:
+        The new version number.
+    """
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = _insert(conn, username, kem, pem)
+        _bump_generation(conn)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return version
+
+
+def get_key(username: str) -> dict | None:
+    """Latest {"kem", "pem", "version"} for one user (indexed lookup), or None."""
+    row = _connect().execute(
+        "SELECT kem, pem, version FROM public_keys WHERE username = ? ORDER BY version DESC LIMIT 1",
+        (username,),
+    ).fetchone()
+    return {"kem": row[0], "pem": row[1], "version": row[2]} if row else None
+
+
+def all_keys() -> dict[str, dict]:
+    """Latest {"kem", "pem", "version"} of every user."""
+    rows = _connect().execute(
+        "SELECT username, kem, pem, MAX(version) FROM public_keys GROUP BY username"
+    ).fetchall()
+    return {user: {"kem": kem, "pem": pem, "version": version} for user, kem, pem, version in rows}
+
+
+def keys_snapshot() -> tuple[int, dict[str, dict]]:
+    """
+    (generation, all_keys()) read in one transaction, so the listing is
+    exactly the one the generation stamps (a publish cannot land between).
+    """
+    conn = _connect()
+    conn.execute("BEGIN")
+    try:
+        generation = registry_generation()
+        keys       = all_keys()
+    finally:
+        conn.execute("COMMIT")
+    return generation, keys
+
+
+def key_history(username: str) -> list[dict]:
+    """Every published version for one user, oldest first."""
+    rows = _connect().execute(
+        "SELECT version, kem, pem, created_at FROM public_keys WHERE username = ? ORDER BY version",
+        (username,),
+    ).fetchall()
+    return [
+        {"version": version, "kem": kem, "pem": pem, "created_at": created_at}
+        for version, kem, pem, created_at in rows
+    ]
@@ -0,0 +1,100 @@
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from Crypto.PublicKey import RSA
+
+from app_config        import RSA_POOL_SIZE
+from helpers.rsa_utils import generate_rsa_keypair
+
+
+def _generate_rsa_components() -> tuple[int, ...]:
+    """
+    Worker entry point: one RSA-2048 private key as its (n, e, d, p, q, u)
+    components. Rebuilding from these skips the (slow) checks a PEM/DER
+    import runs; the worker generated them itself.
+    """
+    key = RSA.generate(2048)
+    return int(key.n), int(key.e), int(key.d), int(key.p), int(key.q), int(key.u)
+
+
+class RSAKeyPool:
+    """
+    Pre-generates RSA-2048 keypairs in a background worker process so that
+    handing one out is instant. Every keypair taken triggers a refill; the
+    pool never holds more than `size` keys (finished or in progress).
+    Keys only travel between the worker and this process, never to disk.
+    """
+
+    def __init__(self, size: int = RSA_POOL_SIZE):
+        self.size      = size
+        self._lock     = threading.Lock()
+        self._pending  = deque()
+        self._executor = None
+
+    def _refill(self) -> None:
+        # Caller holds self._lock
+        if self._executor is None:
+            try:
+                self._executor = ProcessPoolExecutor(max_workers=1)
+            except (OSError, NotImplementedError):
+                self.size = 0
+                return
+        try:
+            while len(self._pending) < self.size:
+                self._pending.append(self._executor.submit(_generate_rsa_components))
+        except RuntimeError:
+            # Broken or shut-down worker: fall back to inline generation
+            self.size = 0
+
+    def start(self) -> None:
+        """Begin filling the pool (safe to call on every rerun)."""
+        with self._lock:
+            if self.size > 0:
+                self._refill()
+
+    def take(self) -> tuple:
+        """
+        Return a keypair like generate_rsa_keypair(): from the pool when one
+        is ready (or the oldest one in progress), inline otherwise.
+        Returns:
+            (private_key_obj, public_pem_str)
+        """
+        with self._lock:
+            future = None
+            if self._pending:
+                ready = [f for f in self._pending if f.done()]
+                future = ready[0] if ready else self._pending[0]
+                self._pending.remove(future)
+            if self.size > 0:
+                self._refill()
+        if future is None:
+            return generate_rsa_keypair()
+        try:
+            key = RSA.construct(future.result(), consistency_check=False)
+        except Exception:
+            return generate_rsa_keypair()
+        return key, key.publickey().export_key().decode()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for future in self._pending:
+                future.cancel()
+            self._pending.clear()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_pool: RSAKeyPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_key_pool() -> RSAKeyPool:
+    """Process-wide RSAKeyPool, created and started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RSAKeyPool()
+        _pool.start()
+        return _pool
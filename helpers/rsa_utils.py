@@ -1,22 +1,65 @@
-import json
+import hashlib
 
 from Crypto.PublicKey import RSA
 from Crypto.Cipher   import PKCS1_OAEP
 
-from app_config import PUBLIC_KEYS_FILE
+from helpers import key_registry
 
-def load_public_keys() -> dict[str, str]:
-    """Return {username: PEM string} from the shared registry file."""
-    if PUBLIC_KEYS_FILE.exists():
-        return json.loads(PUBLIC_KEYS_FILE.read_text())
-    return {}
+KEM_RSA = "rsa-2048"
 
+# Process-wide caches shared by all Streamlit sessions / reruns:
+#   _registry_cache: (generation, latest key of every user)
+#   _key_cache:      (username, sha256(pem)) -> (RsaKey, PKCS1_OAEP cipher)
+# Both are dropped whenever the registry generation changes.
+_registry_cache: tuple | None = None
+_key_cache: dict[tuple[str, str], tuple] = {}
 
-def save_public_key(username: str, pem: str) -> None:
-    """Publish a user's public key to the shared registry."""
-    keys = load_public_keys()
-    keys[username] = pem
-    PUBLIC_KEYS_FILE.write_text(json.dumps(keys, indent=2))
+
+def load_public_keys() -> dict[str, dict]:
+    """
+    Return {username: {"kem": ..., "pem": ..., "version": ...}} with the
+    latest key of every user in the SQLite registry (see key_registry).
+    The full listing is only re-read when a key has been published since;
+    callers get their own copy of every entry.
+    """
+    global _registry_cache
+    cached = _registry_cache
+    if cached is None or cached[0] != key_registry.registry_generation():
+        cached = _registry_cache = key_registry.keys_snapshot()
+        _key_cache.clear()
+    return {user: dict(entry) for user, entry in cached[1].items()}
+
+
+def load_public_key_entry(username: str) -> dict | None:
+    """Latest {"kem", "pem", "version"} of one user (indexed lookup), or None."""
+    return key_registry.get_key(username)
+
+
+def _pem_hash(pem: str) -> str:
+    return hashlib.sha256(pem.encode()).hexdigest()
+
+
+def cached_public_key(pub_pem: str, username: str = "") -> tuple:
+    """
+    Return (RsaKey, PKCS1_OAEP cipher) for a PEM, parsing it only the first
+    time it is seen for this user (until the registry changes).
+    """
+    cache_key = (username, _pem_hash(pub_pem))
+    cached = _key_cache.get(cache_key)
+    if cached is None:
+        key = RSA.import_key(pub_pem)
+        cached = _key_cache[cache_key] = (key, PKCS1_OAEP.new(key))
+    return cached
+
+
+def save_public_key(username: str, pem: str, kem: str = KEM_RSA) -> int:
+    """
+    Publish a user's public key (and its KEM type) to the shared registry
+    as a new version; earlier versions are kept.
+    Returns:
+        The new key version.
+    """
+    return key_registry.publish_key(username, kem, pem)
 
 def generate_rsa_keypair() -> tuple:
     """
@@ -33,15 +76,17 @@ def rsa_encrypt_sym_keys(
     outer: bytes,
     ctr:   bytes,
     pub_pem: str,
+    username: str = "",
 ) -> bytes:
     """
     Pack the 3 symmetric keys into a 64-byte blob and RSA-OAEP-encrypt it
-    with the recipient's public key.
+    with the recipient's public key (parsed once, see cached_public_key).
 
     Layout: inner_key(32) + outer_key(16) + ctr_key(16) = 64 bytes
     """
     blob = inner + outer + ctr
-    return PKCS1_OAEP.new(RSA.import_key(pub_pem)).encrypt(blob)
+    _, cipher = cached_public_key(pub_pem, username)
+    return cipher.encrypt(blob)
 
 
 def rsa_decrypt_sym_keys(
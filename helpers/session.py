@@ -11,14 +11,17 @@ def init_state() -> None:
         "username":       None,
 
         "private_key":    None,
+        "kem":            None,
         "keys_generated": False,
 
         "send_stage":     None,
-        "stego_paths":    [],
-        "enc_sym_keys":   None,
+        "staging_job":    None,
+        "staged_bundle":  None,
 
         "recv_stage":     None,
+        "recv_msg_id":    None,
         "revealed_msg":   None,
+        "revealed_suite": None,
     }
     for key, default in defaults.items():
         if key not in st.session_state:
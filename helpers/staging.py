@@ -0,0 +1,65 @@
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app_config import STAGING_DIR, STAGING_TTL_S
+
+# Every send owns one workspace directory under STAGING_DIR. It is removed
+# when the message is delivered or the send is cancelled; workspaces left
+# behind (closed tabs, crashes) are swept by age once per process start.
+JOB_PREFIX = "job-"
+LEGACY_PREFIX = "tmp"    # tempfile.mkdtemp() default, used before JOB_PREFIX
+
+_sweep_lock = threading.Lock()
+_swept      = False
+
+
+def new_job() -> Path:
+    """Create a fresh per-send workspace and return its path."""
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    return Path(tempfile.mkdtemp(prefix=JOB_PREFIX, dir=STAGING_DIR))
+
+
+def release_job(job_dir) -> None:
+    """Delete a workspace (safe to call twice, or with None)."""
+    if not job_dir:
+        return
+    job_dir = Path(job_dir).resolve()
+    if job_dir.parent == STAGING_DIR.resolve():
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def sweep_stale(ttl: float = STAGING_TTL_S) -> int:
+    """
+    Delete workspaces not modified for ttl seconds: JOB_PREFIX directories
+    and the unmanaged tmp* dirs older versions left behind. Anything else
+    in STAGING_DIR (e.g. a shared tmpfs) is left alone.
+    Returns:
+        Number of entries removed.
+    """
+    if not STAGING_DIR.exists():
+        return 0
+    cutoff  = time.time() - ttl
+    removed = 0
+    for entry in STAGING_DIR.iterdir():
+        if not entry.name.startswith((JOB_PREFIX, LEGACY_PREFIX)):
+            continue
+        try:
+            if entry.is_symlink() or not entry.is_dir() or entry.stat().st_mtime >= cutoff:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+def sweep_at_startup() -> None:
+    """Run sweep_stale once per process (Streamlit re-runs the script on every interaction)."""
+    global _swept
+    with _sweep_lock:
+        if not _swept:
+            _swept = True
+            sweep_stale()
@@ -0,0 +1,112 @@
+import itertools
+import os
+import random
+
+from Crypto.Random import get_random_bytes
+
+from app_config              import CIPHER_SUITE, COVERS_DIR, STEGO_WORKERS
+from helpers.inbox           import open_delivery
+from helpers.kem             import encapsulate_sym_keys
+from helpers.rsa_utils       import load_public_key_entry
+from src.crypto.suites       import get_suite
+from src.stego.batch_engine  import embed_as_completed
+from src.stego.cover_catalog import pick_covers
+from src.stego.lsb_engine    import cover_capacity
+from src.utils.bundle        import KEYS_MEMBER, stego_member
+from src.utils.chunk_manager import iter_prepare_payloads
+from src.utils.wire_format   import WIRE_FORMAT_V2, payload_overhead
+
+# Headless send without a staging step: every chunk is encrypted, embedded
+# and appended to the recipient's incoming bundle as soon as it is ready;
+# keys.bin is written last and the bundle is published with one rename.
+# Chunk encryption (main process), LSB embedding (worker pool) and bundle
+# writes overlap, and the message exists on disk exactly once.
+
+
+def _source_len(source) -> int | None:
+    """Payload length when it is known up front (bytes or a path), else None."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return len(source)
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    return None
+
+
+def stream_send(
+    recipient: str,
+    sender:    str,
+    source,
+    covers:    list | None = None,
+    depth:     int = 1,
+    text:      bool = False,
+    suite=CIPHER_SUITE,
+    max_workers: int = STEGO_WORKERS,
+) -> str:
+    """
+    Encrypt source, embed it across covers and deliver it to recipient's
+    inbox in one streaming pass. Covers are filled in random order and only
+    as many as the payload needs are used.
+    Args:
+        source: Path, bytes-like object, binary file object or iterable of
+            byte pieces (as for iter_prepare_payloads).
+        covers: Anything lsb_engine.embed() accepts (paths, PNG bytes, ...);
+            None picks the fewest fitting covers from the COVERS_DIR library
+            (needs a source of known length).
+        text: Deliver as a text message (source is UTF-8 encoded bytes).
+    Returns:
+        The new message ID.
+    Raises:
+        ValueError: recipient has no public key, the payload does not fit
+            the covers, or a cover could not be embedded. Nothing is
+            delivered in that case.
+    """
+    partner_key = load_public_key_entry(recipient)
+    if partner_key is None:
+        raise ValueError(f"{recipient} has not published a public key.")
+
+    inner_key = get_random_bytes(32)   # ChaCha20
+    outer_key = get_random_bytes(16)   # ASCON-128
+    ctr_key   = get_random_bytes(16)   # AES-128-CTR (seq IDs)
+    key_blob  = encapsulate_sym_keys(
+        inner_key, outer_key, ctr_key, partner_key["pem"], partner_key["kem"], recipient
+    )
+
+    overhead   = payload_overhead(get_suite(suite))
+    total      = _source_len(source)
+    if covers is None:
+        if total is None:
+            raise ValueError("Picking covers from the library needs a source of known length.")
+        covers = pick_covers(COVERS_DIR, total, overhead, depth)
+    capacities = [cover_capacity(cover, depth) for cover in covers]
+    order      = [i for i, capacity in enumerate(capacities) if capacity > overhead]
+    random.shuffle(order)
+    sizes      = [capacities[i] - overhead for i in order]
+    if total is not None and total > sum(sizes):
+        raise ValueError(f"Payload of {total} bytes does not fit the covers ({sum(sizes)} bytes).")
+
+    payloads = iter_prepare_payloads(
+        source,
+        itertools.chain(sizes, [1]),   # one extra byte detects overflow of unsized sources
+        inner_key, outer_key, ctr_key,
+        wire_format=WIRE_FORMAT_V2,
+        suite=suite,
+        text=text,
+    )
+
+    def jobs():
+        for seq_id, (header, body) in enumerate(payloads):
+            if seq_id == len(order):
+                raise ValueError("Payload does not fit the covers.")
+            yield covers[order[seq_id]], header + body
+
+    with open_delivery(recipient, sender, get_suite(suite).name) as (msg_id, writer):
+        embedded = 0
+        for index, stego_png, error in embed_as_completed(jobs(), depth=depth, max_workers=max_workers):
+            if error:
+                raise ValueError(f"Stego embedding failed for cover {order[index] + 1}: {error}")
+            writer.add(stego_member(order[index]), stego_png)
+            embedded += 1
+        if not embedded:
+            raise ValueError("Nothing to send.")
+        writer.add(KEYS_MEMBER, key_blob)
+    return msg_id
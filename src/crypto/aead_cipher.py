@@ -0,0 +1,61 @@
+from Crypto.Cipher import AES, ChaCha20_Poly1305
+
+def encrypt_chacha_poly(plaintext, key, nonce, associated_data=b""):
+    """
+    Encrypts bytes using ChaCha20-Poly1305 (single-pass AEAD).
+    Args:
+        plaintext (bytes): Data to encrypt.
+        key (bytes): 32-byte key.
+        nonce (bytes): 12-byte nonce, unique per key.
+        associated_data (bytes): Authenticated but unencrypted data.
+    Returns:
+        bytes: ciphertext + tag(16)
+    """
+    cipher = ChaCha20_Poly1305.new(key=key, nonce=nonce)
+    cipher.update(associated_data)
+    ciphertext, tag = cipher.encrypt_and_digest(bytes(plaintext))
+    return ciphertext + tag
+
+def decrypt_chacha_poly(encrypted_data, key, nonce, associated_data=b""):
+    """
+    Decrypts and verifies ChaCha20-Poly1305 data.
+    Returns:
+        bytes: The plaintext, or None if the tag does not verify.
+    """
+    try:
+        cipher = ChaCha20_Poly1305.new(key=key, nonce=nonce)
+        cipher.update(associated_data)
+        return cipher.decrypt_and_verify(encrypted_data[:-16], encrypted_data[-16:])
+    except (ValueError, KeyError) as e:
+        print(f"ChaCha20-Poly1305 Error: {e}")
+        return None
+
+def encrypt_aes_gcm(plaintext, key, nonce, associated_data=b""):
+    """
+    Encrypts bytes using AES-GCM (single-pass AEAD).
+    Args:
+        plaintext (bytes): Data to encrypt.
+        key (bytes): 16, 24 or 32-byte key.
+        nonce (bytes): 12-byte nonce, unique per key.
+        associated_data (bytes): Authenticated but unencrypted data.
+    Returns:
+        bytes: ciphertext + tag(16)
+    """
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    cipher.update(associated_data)
+    ciphertext, tag = cipher.encrypt_and_digest(bytes(plaintext))
+    return ciphertext + tag
+
+def decrypt_aes_gcm(encrypted_data, key, nonce, associated_data=b""):
+    """
+    Decrypts and verifies AES-GCM data.
+    Returns:
+        bytes: The plaintext, or None if the tag does not verify.
+    """
+    try:
+        cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+        cipher.update(associated_data)
+        return cipher.decrypt_and_verify(encrypted_data[:-16], encrypted_data[-16:])
+    except (ValueError, KeyError) as e:
+        print(f"AES-GCM Error: {e}")
+        return None
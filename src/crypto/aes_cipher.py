@@ -31,4 +31,17 @@ def decrypt_aes(encrypted_data, key):
         
     except Exception as e:
         print(f"AES Decryption Error: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def aes_ctr_keystream(key, nonce, length):
+    """
+    Produces `length` bytes of AES-CTR keystream in a single pass.
+    Args:
+        key (bytes): Must be 16, 24, or 32 bytes.
+        nonce (bytes): 8-byte nonce (64-bit block counter starts at 0).
+    Returns:
+        bytes: The keystream.
+    """
+    ctr = Counter.new(64, prefix=nonce)
+    cipher = AES.new(key, AES.MODE_CTR, counter=ctr)
+    return cipher.encrypt(bytes(length))
@@ -0,0 +1,126 @@
+import hmac
+import struct
+
+# Optimized pure-Python ASCON-128 (rate 8, a=12, b=6), call-compatible with
+# the reference `ascon` package's encrypt/decrypt. The five state lanes live
+# in local ints, the round constants are precomputed and the message is
+# unpacked / packed in one struct call instead of block by block.
+
+_M = 0xFFFFFFFFFFFFFFFF
+_IV = 0x80400C0600000000      # k=128, rate=64 bits, a=12, b=6
+_RC = tuple(0xF0 - r * 0x10 + r * 0x1 for r in range(12))
+_RC_A = _RC                   # 12 rounds: initialization / finalization
+_RC_B = _RC[6:]               # 6 rounds: between data blocks
+
+def _permute(x0, x1, x2, x3, x4, constants):
+    """ASCON permutation over the lanes, one round per round constant."""
+    M = _M
+    for c in constants:
+        x2 ^= c
+        # Substitution layer (bitsliced 5-bit S-box)
+        x0 ^= x4
+        x4 ^= x3
+        x2 ^= x1
+        t0 = (x0 ^ M) & x1
+        t1 = (x1 ^ M) & x2
+        t2 = (x2 ^ M) & x3
+        t3 = (x3 ^ M) & x4
+        t4 = (x4 ^ M) & x0
+        x0 ^= t1
+        x1 ^= t2
+        x2 ^= t3
+        x3 ^= t4
+        x4 ^= t0
+        x1 ^= x0
+        x0 ^= x4
+        x3 ^= x2
+        x2 ^= M
+        # Linear diffusion layer
+        x0 ^= ((x0 >> 19) | ((x0 << 45) & M)) ^ ((x0 >> 28) | ((x0 << 36) & M))
+        x1 ^= ((x1 >> 61) | ((x1 << 3) & M)) ^ ((x1 >> 39) | ((x1 << 25) & M))
+        x2 ^= ((x2 >> 1) | ((x2 << 63) & M)) ^ ((x2 >> 6) | ((x2 << 58) & M))
+        x3 ^= ((x3 >> 10) | ((x3 << 54) & M)) ^ ((x3 >> 17) | ((x3 << 47) & M))
+        x4 ^= ((x4 >> 7) | ((x4 << 57) & M)) ^ ((x4 >> 41) | ((x4 << 23) & M))
+    return x0, x1, x2, x3, x4
+
+def _words(padded):
+    return struct.unpack(f">{len(padded) // 8}Q", padded)
+
+def _pad(data):
+    """10* padding to a whole number of 8-byte blocks."""
+    return data + b"\x80" + bytes(7 - len(data) % 8)
+
+def _check_args(key, nonce, variant):
+    if variant != "Ascon-128":
+        raise ValueError(f"Unsupported ASCON variant: {variant}")
+    if len(key) != 16 or len(nonce) != 16:
+        raise ValueError("ASCON-128 needs a 16-byte key and a 16-byte nonce.")
+
+def _start(k0, k1, nonce, associateddata):
+    """Initialization and associated data; returns the state lanes."""
+    n0, n1 = struct.unpack(">QQ", nonce)
+    x0, x1, x2, x3, x4 = _permute(_IV, k0, k1, n0, n1, _RC_A)
+    x3 ^= k0
+    x4 ^= k1
+    if associateddata:
+        for word in _words(_pad(bytes(associateddata))):
+            x0, x1, x2, x3, x4 = _permute(x0 ^ word, x1, x2, x3, x4, _RC_B)
+    return x0, x1, x2, x3, x4 ^ 1
+
+def _tag(x0, x1, x2, x3, x4, k0, k1):
+    x0, x1, x2, x3, x4 = _permute(x0, x1 ^ k0, x2 ^ k1, x3, x4, _RC_A)
+    return struct.pack(">QQ", x3 ^ k0, x4 ^ k1)
+
+def encrypt(key, nonce, associateddata, plaintext, variant="Ascon-128"):
+    """
+    ASCON-128 authenticated encryption.
+    Returns:
+        bytes: ciphertext + tag(16)
+    """
+    _check_args(key, nonce, variant)
+    plaintext = bytes(plaintext)
+    k0, k1 = struct.unpack(">QQ", key)
+    x0, x1, x2, x3, x4 = _start(k0, k1, nonce, associateddata)
+
+    words = _words(_pad(plaintext))
+    out = []
+    for word in words[:-1]:
+        x0 ^= word
+        out.append(x0)
+        x0, x1, x2, x3, x4 = _permute(x0, x1, x2, x3, x4, _RC_B)
+    x0 ^= words[-1]
+    out.append(x0)
+
+    ciphertext = struct.pack(f">{len(out)}Q", *out)[:len(plaintext)]
+    return ciphertext + _tag(x0, x1, x2, x3, x4, k0, k1)
+
+def decrypt(key, nonce, associateddata, ciphertext, variant="Ascon-128"):
+    """
+    ASCON-128 authenticated decryption.
+    Returns:
+        bytes: The plaintext, or None if the tag does not verify.
+    """
+    _check_args(key, nonce, variant)
+    ciphertext = bytes(ciphertext)
+    if len(ciphertext) < 16:
+        return None
+    body, tag = ciphertext[:-16], ciphertext[-16:]
+    k0, k1 = struct.unpack(">QQ", key)
+    x0, x1, x2, x3, x4 = _start(k0, k1, nonce, associateddata)
+
+    full = len(body) // 8 * 8
+    out = []
+    for word in _words(body[:full]) if full else ():
+        out.append(x0 ^ word)
+        x0, x1, x2, x3, x4 = _permute(word, x1, x2, x3, x4, _RC_B)
+
+    # Last (partial, possibly empty) block
+    last_len = len(body) - full
+    last = int.from_bytes(body[full:] + bytes(8 - last_len), "big")
+    out.append(x0 ^ last)
+    x0 = last ^ (x0 & (_M >> (last_len * 8))) ^ (0x80 << ((7 - last_len) * 8))
+
+    plaintext = struct.pack(f">{len(out)}Q", *out)[:len(body)]
+    if not hmac.compare_digest(_tag(x0, x1, x2, x3, x4, k0, k1), tag):
+        return None
+    return plaintext
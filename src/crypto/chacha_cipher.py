@@ -2,34 +2,56 @@ from Crypto.Cipher import ChaCha20
 
 def encrypt_chacha(plaintext, key):
     """
-    Encrypts text using ChaCha20 Stream Cipher.
+    Encrypts text or raw bytes using ChaCha20 Stream Cipher.
     Args:
-        plaintext (str): The secret message.
+        plaintext (str | bytes): The secret message (str is UTF-8 encoded).
         key (bytes): 32-byte key.
     Returns:
         bytes: nonce(8) + ciphertext
     """
     cipher = ChaCha20.new(key=key)
-    data_bytes = plaintext.encode('utf-8')
+    data_bytes = plaintext.encode('utf-8') if isinstance(plaintext, str) else bytes(plaintext)
     ciphertext = cipher.encrypt(data_bytes)
     return cipher.nonce + ciphertext
 
-def decrypt_chacha(encrypted_data, key):
+def decrypt_chacha(encrypted_data, key, decode=True):
     """
     Decrypts ChaCha20 data.
     Args:
         encrypted_data (bytes): nonce(8) + ciphertext.
         key (bytes): 32-byte key.
+        decode (bool): Decode the plaintext as UTF-8 (False returns bytes).
     Returns:
-        str: The original plaintext.
+        str: The original plaintext (bytes when decode is False).
     """
     try:
         nonce = encrypted_data[:8]
         ciphertext = encrypted_data[8:]
         cipher = ChaCha20.new(key=key, nonce=nonce)
         plaintext = cipher.decrypt(ciphertext)
-        return plaintext.decode('utf-8')
+        return plaintext.decode('utf-8') if decode else plaintext
         
     except (ValueError, KeyError) as e:
         print(f"ChaCha Decryption Error: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def encrypt_chacha_with_nonce(plaintext, key, nonce):
+    """
+    Encrypts with a caller-supplied (derived) nonce that is not transmitted.
+    Args:
+        plaintext (str | bytes): Data to encrypt (str is UTF-8 encoded).
+        key (bytes): 32-byte key.
+        nonce (bytes): 8 or 12-byte nonce, unique per key.
+    Returns:
+        bytes: ciphertext
+    """
+    data_bytes = plaintext.encode('utf-8') if isinstance(plaintext, str) else bytes(plaintext)
+    return ChaCha20.new(key=key, nonce=nonce).encrypt(data_bytes)
+
+def decrypt_chacha_with_nonce(ciphertext, key, nonce):
+    """
+    Decrypts data produced by encrypt_chacha_with_nonce.
+    Returns:
+        bytes: The plaintext bytes.
+    """
+    return ChaCha20.new(key=key, nonce=nonce).decrypt(ciphertext)
@@ -0,0 +1,86 @@
+import struct
+from collections import namedtuple
+
+from src.crypto.chacha_cipher import encrypt_chacha_with_nonce, decrypt_chacha_with_nonce
+from src.crypto.ascon_cipher import encrypt_ascon_with_nonce, decrypt_ascon_with_nonce
+from src.crypto.aead_cipher import (
+    encrypt_chacha_poly, decrypt_chacha_poly, encrypt_aes_gcm, decrypt_aes_gcm,
+)
+
+# A cipher suite turns one chunk into ciphertext + tag for the compact wire
+# format. Nonces are derived from (salt, seq_id); associated_data is the
+# payload header. open() returns None when authentication fails.
+#   seal(chunk, inner_key, outer_key, salt, seq_id, associated_data) -> bytes
+#   open(sealed, inner_key, outer_key, salt, seq_id, associated_data) -> bytes | None
+CipherSuite = namedtuple("CipherSuite", "suite_id name description tag_len seal open")
+
+SUITE_TRI_HYBRID = 0
+SUITE_CHACHA20_POLY1305 = 1
+SUITE_AES_256_GCM = 2
+
+def _nonce12(salt, seq_id):
+    return salt + struct.pack('>I', seq_id)
+
+def _nonce16(salt, seq_id):
+    return salt + struct.pack('>I', seq_id) + bytes(4)
+
+def _seal_tri_hybrid(chunk, inner_key, outer_key, salt, seq_id, associated_data):
+    inner_data = encrypt_chacha_with_nonce(chunk, inner_key, _nonce12(salt, seq_id))
+    return encrypt_ascon_with_nonce(inner_data, outer_key, _nonce16(salt, seq_id), associated_data)
+
+def _open_tri_hybrid(sealed, inner_key, outer_key, salt, seq_id, associated_data):
+    inner_data = decrypt_ascon_with_nonce(sealed, outer_key, _nonce16(salt, seq_id), associated_data)
+    if inner_data is None:
+        return None
+    return decrypt_chacha_with_nonce(inner_data, inner_key, _nonce12(salt, seq_id))
+
+def _seal_chacha_poly(chunk, inner_key, outer_key, salt, seq_id, associated_data):
+    return encrypt_chacha_poly(chunk, inner_key, _nonce12(salt, seq_id), associated_data)
+
+def _open_chacha_poly(sealed, inner_key, outer_key, salt, seq_id, associated_data):
+    return decrypt_chacha_poly(sealed, inner_key, _nonce12(salt, seq_id), associated_data)
+
+def _seal_aes_gcm(chunk, inner_key, outer_key, salt, seq_id, associated_data):
+    return encrypt_aes_gcm(chunk, inner_key, _nonce12(salt, seq_id), associated_data)
+
+def _open_aes_gcm(sealed, inner_key, outer_key, salt, seq_id, associated_data):
+    return decrypt_aes_gcm(sealed, inner_key, _nonce12(salt, seq_id), associated_data)
+
+SUITES = {}
+
+def register_suite(suite):
+    """Adds a CipherSuite to the registry (IDs and names must be unique)."""
+    for existing in SUITES.values():
+        if existing.suite_id == suite.suite_id or existing.name == suite.name:
+            raise ValueError(f"Cipher suite {suite.suite_id}/{suite.name} is already registered.")
+    SUITES[suite.suite_id] = suite
+    return suite
+
+def get_suite(suite):
+    """
+    Looks a suite up by ID or name.
+    Raises:
+        ValueError: if no such suite is registered.
+    """
+    if isinstance(suite, CipherSuite):
+        return suite
+    for candidate in SUITES.values():
+        if suite in (candidate.suite_id, candidate.name):
+            return candidate
+    raise ValueError(f"Unsupported cipher suite {suite}.")
+
+register_suite(CipherSuite(
+    SUITE_TRI_HYBRID, "tri-hybrid",
+    "ChaCha20 -> ASCON-128 (+ AES-CTR sequence IDs)", 16,
+    _seal_tri_hybrid, _open_tri_hybrid,
+))
+register_suite(CipherSuite(
+    SUITE_CHACHA20_POLY1305, "chacha20-poly1305",
+    "ChaCha20-Poly1305 AEAD (+ AES-CTR sequence IDs)", 16,
+    _seal_chacha_poly, _open_chacha_poly,
+))
+register_suite(CipherSuite(
+    SUITE_AES_256_GCM, "aes-256-gcm",
+    "AES-256-GCM AEAD (+ AES-CTR sequence IDs)", 16,
+    _seal_aes_gcm, _open_aes_gcm,
+))
@@ -0,0 +1,168 @@
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+from src.stego.lsb_engine import embed, extract
+
+def _as_picklable(cover):
+    """
+    File objects cannot cross a process boundary; read them into bytes
+    (the whole file, wherever an earlier probe left the position).
+    """
+    if hasattr(cover, "getvalue"):
+        return cover.getvalue()
+    if hasattr(cover, "read"):
+        if hasattr(cover, "seek"):
+            cover.seek(0)
+        return cover.read()
+    return cover
+
+def _embed_job(cover, secret_data, engine, depth):
+    """Worker entry point: decode, embed and PNG-encode a single cover."""
+    stego_png = embed(cover, secret_data, engine=engine, depth=depth)
+    if stego_png is None:
+        raise ValueError("cover is unreadable or too small for its payload")
+    return stego_png
+
+def embed_batch(covers, payloads, engine="numpy", depth=1, max_workers=None, executor=None):
+    """
+    Embeds payloads[i] into covers[i] for every pair, fanning the work out
+    over a process pool. One failing image does not abort the others.
+    Args:
+        covers (list): Anything lsb_engine.embed() accepts; file objects are
+            read into bytes before being sent to the workers.
+        payloads (list[bytes]): One payload per cover.
+        engine (str): Embed engine passed through to embed().
+        depth (int): Embedding depth passed through to embed().
+        max_workers (int): Pool size; defaults to the CPU count. With 1
+            worker (or a single image) everything runs in-process.
+        executor (Executor): Optional existing pool to reuse instead of
+            creating one for this call.
+    Returns:
+        list[tuple]: (stego_png, error) per payload, in payload order. Exactly
+        one of the two is None.
+    """
+    if len(covers) != len(payloads):
+        raise ValueError(f"Got {len(covers)} cover(s) for {len(payloads)} payload(s).")
+
+    jobs = [(_as_picklable(c), bytes(p)) for c, p in zip(covers, payloads)]
+    workers = max_workers or os.cpu_count() or 1
+
+    if executor is None and (workers == 1 or len(jobs) <= 1):
+        results = []
+        for cover, data in jobs:
+            try:
+                results.append((_embed_job(cover, data, engine, depth), None))
+            except Exception as e:
+                results.append((None, str(e)))
+        return results
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(jobs)))
+    try:
+        futures = [executor.submit(_embed_job, cover, data, engine, depth) for cover, data in jobs]
+        results = []
+        for future in futures:
+            try:
+                results.append((future.result(), None))
+            except Exception as e:
+                results.append((None, str(e)))
+        return results
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+def embed_as_completed(jobs, engine="numpy", depth=1, max_workers=None, executor=None, window=None):
+    """
+    Streaming variant of embed_batch: consumes (cover, payload) pairs lazily
+    and yields each stego-image as soon as it is done (not in input order).
+    At most `window` embeds are in flight, so the producer of the jobs
+    (e.g. chunk encryption) overlaps with embedding without running ahead.
+    Closing the generator early cancels the embeds that have not started.
+    Args:
+        jobs (iterable): (cover, payload) pairs; covers as for embed_batch.
+        engine (str): Embed engine passed through to embed().
+        depth (int): Embedding depth passed through to embed().
+        max_workers (int): Pool size; defaults to the CPU count. With 1
+            worker everything runs in-process, one job at a time.
+        executor (Executor): Optional existing pool to reuse.
+        window (int): Maximum embeds in flight; defaults to 2 per worker.
+    Yields:
+        tuple: (index, stego_png, error) where exactly one of stego_png and
+        error is None.
+    """
+    workers = max_workers or os.cpu_count() or 1
+
+    if executor is None and workers == 1:
+        for index, (cover, data) in enumerate(jobs):
+            try:
+                result = (_embed_job(_as_picklable(cover), bytes(data), engine, depth), None)
+            except Exception as e:
+                result = (None, str(e))
+            yield (index, *result)
+        return
+
+    window = window or 2 * workers
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    jobs = enumerate(jobs)
+    futures = {}
+    try:
+        while True:
+            for index, (cover, data) in itertools.islice(jobs, window - len(futures)):
+                futures[executor.submit(_embed_job, _as_picklable(cover), bytes(data), engine, depth)] = index
+            if not futures:
+                return
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures.pop(future)
+                try:
+                    result = (future.result(), None)
+                except Exception as e:
+                    result = (None, str(e))
+                yield (index, *result)
+    finally:
+        for future in futures:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def extract_as_completed(stegos, engine="numpy", max_workers=None, executor=None):
+    """
+    Extracts the payload of every stego-image over a process pool and yields
+    results as soon as each image is done (not in input order), so callers
+    can start decrypting the first chunk while the rest are still decoding.
+    Closing the generator early (e.g. on a tamper alert) cancels the
+    extractions that have not started yet.
+    Args:
+        stegos (list): Anything lsb_engine.extract() accepts; file objects
+            are read into bytes before being sent to the workers.
+        engine (str): Extract engine passed through to extract().
+        max_workers (int): Pool size; defaults to the CPU count. With 1
+            worker (or a single image) everything runs in-process.
+        executor (Executor): Optional existing pool to reuse.
+    Yields:
+        tuple: (index, data) where data is None if extraction failed.
+    """
+    jobs = [_as_picklable(s) for s in stegos]
+    workers = max_workers or os.cpu_count() or 1
+
+    if executor is None and (workers == 1 or len(jobs) <= 1):
+        for index, stego in enumerate(jobs):
+            yield index, extract(stego, engine=engine)
+        return
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(jobs)))
+    futures = {executor.submit(extract, stego, engine): i for i, stego in enumerate(jobs)}
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
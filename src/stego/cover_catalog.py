@@ -0,0 +1,173 @@
+import json
+import os
+import tempfile
+
+from src.stego.lsb_engine import MODE_CHANNELS, capacity_bytes, cover_geometry
+
+# A cover library is a directory of images plus a JSON index of their
+# geometry, so choosing covers never opens an image:
+#
+#   <cover_dir>/.cover_index.json
+#     {"covers": {"<relative path>": {"mtime_ns", "size", "width", "height",
+#                                     "mode", "samples"}, ...}}
+#
+# Files that cannot be read as images are recorded as {"mtime_ns", "size",
+# "unreadable": true} and left out of the catalog.
+#
+# Entries are keyed by path and trusted while the file's mtime and size are
+# unchanged; new or modified files are probed from their header only.
+# Capacity depends on the embedding depth, so the index stores channel
+# samples and capacity is derived per depth with capacity_bytes().
+CATALOG_INDEX = ".cover_index.json"
+COVER_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+
+# Last index loaded or saved per library in this process: later scans only
+# stat the files, without re-reading the JSON or, when the index cannot be
+# written (e.g. a read-only library), re-probing every cover.
+_indexes = {}
+
+def _index_path(cover_dir):
+    return os.path.join(cover_dir, CATALOG_INDEX)
+
+def _load_index(cover_dir):
+    key = os.path.abspath(cover_dir)
+    cached = _indexes.get(key)
+    if cached is not None:
+        return cached
+    try:
+        with open(_index_path(cover_dir), "r", encoding="utf-8") as f:
+            covers = json.load(f)["covers"]
+    except (FileNotFoundError, ValueError, KeyError):
+        return {}
+    _indexes[key] = covers
+    return covers
+
+def _save_index(cover_dir, covers):
+    """
+    Writes the index atomically (unique temp file + os.replace, safe with
+    concurrent scans). A library that cannot be written to only loses the
+    on-disk index; the catalog itself still works.
+    """
+    _indexes[os.path.abspath(cover_dir)] = covers
+    path = _index_path(cover_dir)
+    try:
+        fd, tmp = tempfile.mkstemp(prefix=CATALOG_INDEX + ".", suffix=".tmp", dir=cover_dir)
+    except OSError as e:
+        print(f"[WARN] Cover index not saved: {e}")
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"covers": covers}, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[WARN] Cover index not saved: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+def _iter_cover_files(cover_dir):
+    for root, dirs, files in os.walk(cover_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in files:
+            if name.lower().endswith(COVER_EXTENSIONS):
+                yield os.path.join(root, name)
+
+def scan_covers(cover_dir):
+    """
+    Brings the library index of cover_dir up to date and returns it.
+    Only files that are new or changed since the last scan are opened, and
+    only their header is read; unreadable images are skipped.
+    Args:
+        cover_dir (str | Path): Directory holding the cover images.
+    Returns:
+        list[dict]: One entry per cover with its file "path" plus
+        width, height, mode and samples (channel samples).
+    """
+    if not os.path.isdir(cover_dir):
+        return []
+    known = _load_index(cover_dir)
+    covers = {}
+    changed = False
+    for path in _iter_cover_files(cover_dir):
+        rel = os.path.relpath(path, cover_dir)
+        stat = os.stat(path)
+        entry = known.get(rel)
+        if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+            try:
+                width, height, mode = cover_geometry(path)
+                entry.update(width=width, height=height, mode=mode, samples=width * height * MODE_CHANNELS[mode])
+            except Exception as e:
+                print(f"Skipping cover {rel}: {e}")
+                entry["unreadable"] = True    # not probed again until the file changes
+            changed = True
+        covers[rel] = entry
+    if changed or covers.keys() != known.keys():
+        print(f"[INFO] Cover index updated: {len(covers)} file(s).")
+        _save_index(cover_dir, covers)
+    return [
+        dict(entry, path=os.path.join(cover_dir, rel))
+        for rel, entry in sorted(covers.items())
+        if not entry.get("unreadable")
+    ]
+
+def entry_capacity(entry, depth=1):
+    """Payload bytes embed() can hide in a catalog entry at the given depth."""
+    return capacity_bytes(entry["samples"], depth)
+
+def select_covers(entries, payload_len, overhead, depth=1):
+    """
+    Picks the fewest covers that can carry payload_len bytes when every
+    cover receives one chunk with `overhead` bytes of encryption overhead
+    (e.g. wire_format.payload_overhead(suite)); the stego header is
+    already accounted for by the capacity.
+    The largest covers give the smallest set; each one is then swapped
+    for the smallest unused cover that still leaves enough room, so the
+    set wastes as little capacity as possible.
+    Args:
+        entries (list[dict]): Catalog entries from scan_covers().
+        payload_len (int): Bytes to embed, before per-chunk overhead.
+        overhead (int): Per-chunk overhead in bytes.
+        depth (int): Embedding depth.
+    Returns:
+        list[dict]: The chosen entries, largest first.
+    Raises:
+        ValueError: If the whole library cannot hold the payload.
+    """
+    usable = sorted(
+        ((entry_capacity(e, depth) - overhead, i) for i, e in enumerate(entries)),
+        reverse=True,
+    )
+    usable = [(u, i) for u, i in usable if u > 0]
+
+    chosen, total = [], 0
+    for u, i in usable:
+        if total >= max(payload_len, 1):
+            break
+        chosen.append((u, i))
+        total += u
+    if total < payload_len or not chosen:
+        raise ValueError(f"Cover library is too small! Payload needs {payload_len} bytes, covers hold {total}.")
+
+    spare = usable[len(chosen):]    # descending
+    for pos in range(len(chosen) - 1, -1, -1):
+        u, i = chosen[pos]
+        need = payload_len - (total - u)
+        fits = [c for c in spare if need <= c[0] < u]
+        if fits:
+            best = fits[-1]
+            spare.remove(best)
+            spare.append((u, i))
+            spare.sort(reverse=True)
+            chosen[pos] = best
+            total += best[0] - u
+    chosen.sort(reverse=True)
+    return [entries[i] for _, i in chosen]
+
+def pick_covers(cover_dir, payload_len, overhead, depth=1):
+    """
+    Scans cover_dir (incrementally) and returns the paths of the covers
+    select_covers() chooses for the payload.
+    """
+    return [entry["path"] for entry in select_covers(scan_covers(cover_dir), payload_len, overhead, depth)]
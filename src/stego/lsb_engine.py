@@ -1,6 +1,37 @@
+from io import BytesIO
 from PIL import Image
 import numpy as np
 import os
+import struct
+import zlib
+
+# Stego header, written into the LSBs of the first HEADER_BITS channel samples:
+#   magic(2) + version(1) + flags(1) + payload length(4) + CRC-32 of the first 8 bytes(4)
+STEGO_MAGIC = b"SG"
+STEGO_VERSION = 1
+HEADER_FORMAT = ">2sBBI"
+HEADER_LEN = struct.calcsize(HEADER_FORMAT) + 4
+HEADER_BITS = HEADER_LEN * 8
+
+# Images written before the header existed carry a bare 32-bit payload
+# length in the LSBs of their first 32 RGB channel samples, then the payload
+# at 1 bit per sample. extract() falls back to it when the header is missing.
+LEGACY_LENGTH_BITS = 32
+
+# Header flags: bits 0-1 hold (payload depth - 1), bits 2-4 the cover mode code
+DEPTH_MASK = 0x03
+MODE_SHIFT = 2
+MODE_MASK = 0x1C
+SUPPORTED_DEPTHS = (1, 2, 3, 4)
+
+# Image modes embedded natively (no conversion); RGB keeps code 0 so
+# headers written before mode support still decode.
+MODE_CODES = {
+    "RGB": 0,
+    "L": 1,
+    "RGBA": 2,
+    "I;16": 3,
+}
 
 def msg_to_bin(msg):
     """Converts a string or bytes to a binary string."""
@@ -17,71 +48,323 @@ def bin_to_bytes(binary_str):
     """Converts a binary string back to bytes."""
     return int(binary_str, 2).to_bytes((len(binary_str) + 7) // 8, byteorder='big')
 
-def embed_data(image_path, secret_data, output_path):
+def build_header(data_len, flags=0):
+    """Packs the versioned stego header for a payload of data_len bytes."""
+    fields = struct.pack(HEADER_FORMAT, STEGO_MAGIC, STEGO_VERSION, flags, data_len)
+    return fields + struct.pack('>I', zlib.crc32(fields))
+
+def parse_header(header):
+    """
+    Validates a raw stego header.
+    Returns:
+        tuple: (flags, data_len), or None if the magic, version or checksum
+        do not match (i.e. the image carries no payload from this engine).
+    """
+    if len(header) != HEADER_LEN:
+        return None
+    fields, checksum = header[:-4], struct.unpack('>I', header[-4:])[0]
+    magic, version, flags, data_len = struct.unpack(HEADER_FORMAT, fields)
+    if magic != STEGO_MAGIC or version != STEGO_VERSION:
+        return None
+    if zlib.crc32(fields) != checksum:
+        return None
+    return flags, data_len
+
+# NumPy layouts accepted as in-memory covers, keyed by (ndim, channels, dtype)
+ARRAY_MODES = {
+    (2, 1, np.dtype(np.uint8)): "L",
+    (3, 3, np.dtype(np.uint8)): "RGB",
+    (3, 4, np.dtype(np.uint8)): "RGBA",
+    (2, 1, np.dtype(np.uint16)): "I;16",
+}
+
+MODE_CHANNELS = {
+    "RGB": 3,
+    "L": 1,
+    "RGBA": 4,
+    "I;16": 1,
+}
+
+def _native_mode(image):
+    """
+    Returns the mode a PIL image is embedded in, without decoding it.
+    Palette, bilevel and other modes fall back to the nearest supported mode
+    (RGBA when there is transparency, else RGB/L).
+    """
+    mode = image.mode
+    if mode.startswith("I;16") or mode == "I":
+        return "I;16"
+    if mode == "1":
+        return "L"
+    if mode in ("LA", "PA") or (mode == "P" and "transparency" in image.info):
+        return "RGBA"
+    if mode in MODE_CODES:
+        return mode
+    return "RGB"
+
+def _load_pixels(image, copy=True):
+    """
+    Returns (pixels, mode) for a PIL image without converting modes that can
+    be embedded natively (see _native_mode).
     """
-    Embeds binary data into the LSB of an image.
+    to_array = np.array if copy else np.asarray
+    mode = _native_mode(image)
+    if mode == "I;16":
+        if image.mode != "I":
+            return to_array(image, dtype=np.uint16), mode
+        pixels = np.asarray(image)
+        if pixels.min() >= 0 and pixels.max() <= 0xFFFF:
+            return pixels.astype(np.uint16), mode
+        mode = "RGB"
+    if image.mode != mode:
+        image = image.convert(mode)
+    return to_array(image), mode
+
+def _load_source(source, copy=True):
+    """
+    Decodes a cover/stego image given as a path, encoded bytes, a binary
+    file object, a NumPy array or a PIL image.
+    Returns:
+        tuple: (pixels, mode). With copy=False the array may be read-only.
+    """
+    if isinstance(source, np.ndarray):
+        channels = source.shape[2] if source.ndim == 3 else 1
+        mode = ARRAY_MODES.get((source.ndim, channels, source.dtype))
+        if mode is None:
+            raise TypeError(f"Unsupported array layout {source.shape} {source.dtype}")
+        return (np.array(source, order="C") if copy else np.ascontiguousarray(source)), mode
+    if isinstance(source, Image.Image):
+        return _load_pixels(source, copy)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = BytesIO(source)
+    with Image.open(source) as image:
+        return _load_pixels(image, copy)
+
+def _source_name(source):
+    """Best-effort display name for log messages."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(source)
+    name = getattr(source, "name", None)
+    if isinstance(name, str):
+        return os.path.basename(name)
+    return f"<{type(source).__name__}>"
+
+def _embed_bits_loop(flat_pixels, start, data, depth):
+    """Reference embedder: writes the data one bit at a time, `depth` bits
+    per channel sample (most significant of the group first)."""
+    bin_data = msg_to_bin(bytes(data))
+    bin_data += "0" * (-len(bin_data) % depth)
+    mask = np.iinfo(flat_pixels.dtype).max ^ ((1 << depth) - 1)
+    for i in range(0, len(bin_data), depth):
+        idx = start + i // depth
+        val = int(flat_pixels[idx])
+        flat_pixels[idx] = (val & mask) | int(bin_data[i:i + depth], 2)
+
+def _embed_bits_numpy(flat_pixels, start, data, depth):
+    """Vectorized embedder: expands the data with unpackbits, groups the bits
+    `depth` at a time and rewrites the low bits of the affected channel samples
+    in a single pass."""
+    bits = np.unpackbits(np.frombuffer(bytes(data), dtype=np.uint8))
+    if depth > 1:
+        bits = np.concatenate([bits, np.zeros(-bits.size % depth, dtype=np.uint8)])
+        weights = (1 << np.arange(depth - 1, -1, -1)).astype(np.uint8)
+        bits = bits.reshape(-1, depth) @ weights
+    target = flat_pixels[start:start + bits.size]
+    np.bitwise_and(target, np.iinfo(target.dtype).max ^ ((1 << depth) - 1), out=target)
+    np.bitwise_or(target, bits.astype(target.dtype), out=target)
+
+EMBED_ENGINES = {
+    "numpy": _embed_bits_numpy,
+    "loop": _embed_bits_loop,
+}
+
+def capacity_bytes(num_samples, depth=1):
+    """Returns how many payload bytes fit in an image of num_samples channel samples."""
+    return max(0, (num_samples - HEADER_BITS) * depth // 8)
+
+def cover_geometry(cover):
+    """
+    Returns (width, height, mode) of a cover as embed() will see it, where
+    mode is the native embedding mode. Only the image header is read;
+    pixels are not decoded. A file object is left at the position it had.
     Args:
-        image_path (str): Path to cover image.
+        cover: Anything embed() accepts except a numpy array.
+    """
+    if isinstance(cover, Image.Image):
+        return cover.size + (_native_mode(cover),)
+    if isinstance(cover, (bytes, bytearray, memoryview)):
+        cover = BytesIO(cover)
+    position = cover.tell() if hasattr(cover, "tell") else None
+    try:
+        with Image.open(cover) as image:
+            return image.size + (_native_mode(image),)
+    finally:
+        if position is not None:
+            cover.seek(position)
+
+def cover_capacity(cover, depth=1):
+    """
+    Returns how many payload bytes embed() can hide in a cover at the given
+    depth. Only the image header is read; pixels are not decoded.
+    Args:
+        cover: Anything embed() accepts.
+    """
+    if isinstance(cover, np.ndarray):
+        return capacity_bytes(cover.size, depth)
+    width, height, mode = cover_geometry(cover)
+    return capacity_bytes(width * height * MODE_CHANNELS[mode], depth)
+
+def embed(cover, secret_data, engine="numpy", depth=1):
+    """
+    Embeds binary data into the LSB of an image, behind a versioned header,
+    entirely in memory.
+    The header always uses 1 bit per channel sample; the payload uses `depth`
+    bits per sample. L, RGB, RGBA and 16-bit grayscale covers are embedded
+    in their own mode (recorded in the header flags) without conversion.
+    Args:
+        cover: Path, encoded image bytes, binary file object, NumPy array
+            (HxW uint8/uint16, HxWx3 or HxWx4 uint8) or PIL image.
         secret_data (bytes): The encrypted chunk to hide.
-        output_path (str): Where to save the stego-image.
+        engine (str): "numpy" (vectorized, default) or "loop" (reference
+            bit-by-bit implementation). Both produce identical images.
+        depth (int): Bits per channel sample used for the payload (1-4).
+    Returns:
+        bytes: The PNG-encoded stego-image, or None on failure.
     """
+    if engine not in EMBED_ENGINES:
+        raise ValueError(f"Unknown embed engine: {engine}")
+    if depth not in SUPPORTED_DEPTHS:
+        raise ValueError(f"Embedding depth must be one of {SUPPORTED_DEPTHS}, got {depth}")
+
+    name = _source_name(cover)
     try:
-        image = Image.open(image_path).convert('RGB')
-        pixels = np.array(image)
+        pixels, mode = _load_source(cover)
     except Exception as e:
-        print(f"Error opening image {image_path}: {e}")
-        return False
+        print(f"Error opening image {name}: {e}")
+        return None
 
-    data_len = len(secret_data)
-    bin_len = format(data_len, '032b')
-    bin_data = bin_len + msg_to_bin(secret_data)
+    capacity = capacity_bytes(pixels.size, depth)
+    if len(secret_data) > capacity:
+        print(f"ERROR: Image {name} is too small! Need {len(secret_data)} bytes, have {capacity} at depth {depth}.")
+        return None
+
+    print(f"[STEGO] Hiding {len(secret_data)} bytes in {name} ({mode}, {depth} bit/channel)...")
+
+    flat_pixels = pixels.reshape(-1)
+    embed_bits = EMBED_ENGINES[engine]
+    flags = (depth - 1) | (MODE_CODES[mode] << MODE_SHIFT)
+    embed_bits(flat_pixels, 0, build_header(len(secret_data), flags=flags), 1)
+    embed_bits(flat_pixels, HEADER_BITS, secret_data, depth)
+    buf = BytesIO()
+    Image.fromarray(pixels).save(buf, format="PNG")
+    return buf.getvalue()
 
-    total_pixels = pixels.size // 3
-    req_pixels = len(bin_data)
-    
-    if req_pixels > total_pixels:
-        print(f"ERROR: Image {image_path} is too small! Need {req_pixels} bits, have {total_pixels}.")
+def embed_data(image_path, secret_data, output_path, engine="numpy", depth=1):
+    """
+    Embeds binary data into the LSB of an image file (see embed()).
+    Args:
+        image_path (str): Path to cover image.
+        secret_data (bytes): The encrypted chunk to hide.
+        output_path (str): Where to save the stego-image.
+        engine (str): "numpy" (default) or "loop".
+        depth (int): Bits per channel sample used for the payload (1-4).
+    Returns:
+        bool: True if the stego-image was written.
+    """
+    stego_png = embed(image_path, secret_data, engine=engine, depth=depth)
+    if stego_png is None:
         return False
+    with open(output_path, "wb") as f:
+        f.write(stego_png)
+    return True
 
-    print(f"[STEGO] Hiding {len(secret_data)} bytes in {os.path.basename(image_path)}...")
+def _extract_bits_loop(pixels, start, nbytes, depth):
+    """Reference extractor: rebuilds the bits as a '0'/'1' string."""
+    nbits = nbytes * 8
+    data_bits = ""
+    for i in range(start, start + (nbits + depth - 1) // depth):
+        data_bits += format(int(pixels[i]) & ((1 << depth) - 1), f"0{depth}b")
+    return bin_to_bytes(data_bits[:nbits]) if nbytes else b""
 
-    flat_pixels = pixels.flatten()
+def _extract_bits_numpy(pixels, start, nbytes, depth):
+    """Vectorized extractor: unpacks the low `depth` bits of just enough
+    channel samples and packs exactly nbytes * 8 bits back into bytes."""
+    nbits = nbytes * 8
+    values = pixels[start:start + (nbits + depth - 1) // depth]
+    if depth == 1:
+        return np.packbits(values & 1).tobytes()
+    shifts = np.arange(depth - 1, -1, -1, dtype=values.dtype)
+    bits = ((values[:, None] >> shifts) & 1).astype(np.uint8).reshape(-1)
+    return np.packbits(bits[:nbits]).tobytes()
 
-    for i in range(req_pixels):
-        val = flat_pixels[i]
-        bit = int(bin_data[i])
-        if bit == 0:
-            flat_pixels[i] = val & 254
-        else:
-            flat_pixels[i] = val | 1
-    new_pixels = flat_pixels.reshape(pixels.shape)
-    new_image = Image.fromarray(new_pixels.astype('uint8'), 'RGB')
-    new_image.save(output_path)
-    return True
+EXTRACT_ENGINES = {
+    "numpy": _extract_bits_numpy,
+    "loop": _extract_bits_loop,
+}
 
-def extract_data(stego_image_path):
+def extract(stego, engine="numpy", legacy=True):
     """
-    Extracts binary data from the LSB of an image.
+    Extracts binary data from the LSB of an image, entirely in memory.
+    The header is validated (magic, version, checksum) and the declared
+    length is checked against the image's capacity before any payload bits
+    are read, so non-stego or damaged images are rejected immediately.
+    The embedding depth and cover mode are read from the header flags.
+    RGB images without a header are read in the legacy length-only format
+    when legacy is set and their stored length fits the image.
+    Args:
+        stego: Path, encoded image bytes, binary file object, NumPy array
+            or PIL image.
+        engine (str): "numpy" (vectorized, default) or "loop" (reference).
+        legacy (bool): Fall back to the legacy format.
     Returns:
-        bytes: The extracted secret data.
+        bytes: The extracted secret data, or None if the image is rejected.
     """
+    if engine not in EXTRACT_ENGINES:
+        raise ValueError(f"Unknown extract engine: {engine}")
+
+    name = _source_name(stego)
     try:
-        image = Image.open(stego_image_path).convert('RGB')
-        pixels = np.array(image).flatten()
+        pixels, mode = _load_source(stego, copy=False)
+        pixels = pixels.reshape(-1)
     except Exception as e:
-        print(f"Error opening image {stego_image_path}: {e}")
+        print(f"Error opening image {name}: {e}")
         return None
 
-    len_bits = ""
-    for i in range(32):
-        len_bits += str(pixels[i] & 1)
-        
-    data_len = int(len_bits, 2)
+    if pixels.size < HEADER_BITS:
+        print(f"ERROR: Image {name} is too small to carry a stego header.")
+        return None
 
-    total_bits = data_len * 8
-    data_bits = ""
+    header = parse_header(EXTRACT_ENGINES[engine](pixels, 0, HEADER_LEN, 1))
+    if header is None:
+        data = _extract_legacy(pixels, mode, engine) if legacy else None
+        if data is None:
+            print(f"ERROR: No valid stego header in {name}.")
+        return data
+    flags, data_len = header
+    depth = (flags & DEPTH_MASK) + 1
+    if (flags & MODE_MASK) >> MODE_SHIFT != MODE_CODES[mode]:
+        print(f"ERROR: Image {name} was re-encoded; header mode does not match {mode}.")
+        return None
 
-    for i in range(32, 32 + total_bits):
-        data_bits += str(pixels[i] & 1)
+    if data_len > capacity_bytes(pixels.size, depth):
+        print(f"ERROR: Length header in {name} exceeds image capacity.")
+        return None
+
+    return EXTRACT_ENGINES[engine](pixels, HEADER_BITS, data_len, depth)
+
+def _extract_legacy(pixels, mode, engine):
+    """Reads the legacy length-only format, or returns None if it does not fit."""
+    if mode != "RGB":
+        return None
+    data_len = int.from_bytes(EXTRACT_ENGINES[engine](pixels, 0, LEGACY_LENGTH_BITS // 8, 1), "big")
+    if not data_len or LEGACY_LENGTH_BITS + data_len * 8 > pixels.size:
+        return None
+    return EXTRACT_ENGINES[engine](pixels, LEGACY_LENGTH_BITS, data_len, 1)
 
-    return bin_to_bytes(data_bits)
\ No newline at end of file
+def extract_data(stego_image_path, engine="numpy"):
+    """
+    Extracts binary data from the LSB of an image file (see extract()).
+    Returns:
+        bytes: The extracted secret data, or None if the image is rejected.
+    """
+    return extract(stego_image_path, engine=engine)
@@ -0,0 +1,187 @@
+import os
+import struct
+import zlib
+
+# Single-file message bundle: the stego-images and the KEM key blob of one
+# message in one uncompressed container.
+#
+#   magic(4) = b"SGB1"
+#   member data, back to back
+#   table:   per member: name_len(2) + name(utf-8) + offset(8) + size(8) + crc32(4)
+#   trailer: table_offset(8) + member_count(4) + magic(4) = b"SGBT"
+#
+# The offset table sits at the end so a bundle can be written in one
+# streaming pass (members are appended as they become ready); readers seek
+# to the fixed-size trailer, load the table and then read any member
+# directly.
+BUNDLE_MAGIC = b"SGB1"
+TRAILER_MAGIC = b"SGBT"
+TRAILER_FORMAT = ">QI4s"
+TRAILER_LEN = struct.calcsize(TRAILER_FORMAT)
+ENTRY_FORMAT = ">QQI"
+ENTRY_LEN = struct.calcsize(ENTRY_FORMAT)
+
+# Conventional member names
+KEYS_MEMBER = "keys.bin"
+STEGO_PREFIX = "stego_"
+
+def stego_member(index):
+    """Member name of the index-th stego-image."""
+    return f"{STEGO_PREFIX}{index}.png"
+
+class BundleWriter:
+    """
+    Appends members to a new bundle file; close() writes the offset table.
+    Usable as a context manager. Member names must be unique.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(BUNDLE_MAGIC)
+        self._entries = {}
+
+    def add(self, name, data):
+        """Appends one member and returns its size."""
+        if name in self._entries:
+            raise ValueError(f"Bundle already has a member named {name}.")
+        data = bytes(data)
+        offset = self._file.tell()
+        self._file.write(data)
+        self._entries[name] = (offset, len(data), zlib.crc32(data))
+        return len(data)
+
+    def close(self, fsync=False):
+        """Writes the offset table and trailer and closes the file."""
+        if self._file.closed:
+            return
+        table_offset = self._file.tell()
+        for name, (offset, size, crc) in self._entries.items():
+            encoded = name.encode("utf-8")
+            self._file.write(struct.pack(">H", len(encoded)) + encoded)
+            self._file.write(struct.pack(ENTRY_FORMAT, offset, size, crc))
+        self._file.write(struct.pack(TRAILER_FORMAT, table_offset, len(self._entries), TRAILER_MAGIC))
+        if fsync:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+    def abort(self):
+        """Closes and deletes an unfinished bundle."""
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class BundleReader:
+    """
+    Random access to the members of a bundle through one open file.
+    Usable as a context manager.
+    Raises:
+        ValueError: if the file is not a complete bundle.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._entries = self._read_table()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _read_table(self):
+        f = self._file
+        f.seek(0, os.SEEK_END)
+        file_size = f.tell()
+        if file_size < len(BUNDLE_MAGIC) + TRAILER_LEN:
+            raise ValueError("Bundle is truncated.")
+        f.seek(0)
+        if f.read(len(BUNDLE_MAGIC)) != BUNDLE_MAGIC:
+            raise ValueError("Not a message bundle.")
+        f.seek(file_size - TRAILER_LEN)
+        table_offset, count, magic = struct.unpack(TRAILER_FORMAT, f.read(TRAILER_LEN))
+        if magic != TRAILER_MAGIC or not len(BUNDLE_MAGIC) <= table_offset <= file_size - TRAILER_LEN:
+            raise ValueError("Bundle is incomplete or corrupted.")
+
+        f.seek(table_offset)
+        table = f.read(file_size - TRAILER_LEN - table_offset)
+        entries, pos = {}, 0
+        for _ in range(count):
+            if pos + 2 > len(table):
+                raise ValueError("Bundle offset table is truncated.")
+            (name_len,) = struct.unpack_from(">H", table, pos)
+            pos += 2
+            if pos + name_len + ENTRY_LEN > len(table):
+                raise ValueError("Bundle offset table is truncated.")
+            try:
+                name = table[pos:pos + name_len].decode("utf-8")
+            except UnicodeDecodeError:
+                raise ValueError("Bundle offset table is corrupted.") from None
+            pos += name_len
+            offset, size, crc = struct.unpack_from(ENTRY_FORMAT, table, pos)
+            pos += ENTRY_LEN
+            if name in entries:
+                raise ValueError(f"Bundle has more than one member named {name}.")
+            if offset < len(BUNDLE_MAGIC) or offset + size > table_offset:
+                raise ValueError(f"Bundle member {name} lies outside the data area.")
+            entries[name] = (offset, size, crc)
+        if pos != len(table):
+            raise ValueError("Bundle offset table is corrupted.")
+        return entries
+
+    def names(self):
+        """Member names in the order they were written."""
+        return list(self._entries)
+
+    def stego_names(self):
+        """Stego-image member names, in index order."""
+        names = [n for n in self._entries if n.startswith(STEGO_PREFIX)]
+        return sorted(names, key=lambda n: int(n[len(STEGO_PREFIX):].split(".")[0]))
+
+    def size(self, name):
+        return self._entries[name][1]
+
+    def read(self, name):
+        """
+        Returns one member's bytes.
+        Raises:
+            KeyError: if there is no such member.
+            ValueError: if the member fails its CRC check.
+        """
+        offset, size, crc = self._entries[name]
+        self._file.seek(offset)
+        data = self._file.read(size)
+        if len(data) != size or zlib.crc32(data) != crc:
+            raise ValueError(f"Bundle member {name} is corrupted.")
+        return data
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def write_bundle(path, stego_images, key_blob):
+    """
+    Writes a bundle holding stego_images (list of PNG bytes) as
+    stego_0.png, stego_1.png, ... followed by key_blob as keys.bin.
+    """
+    with BundleWriter(path) as writer:
+        for index, png in enumerate(stego_images):
+            writer.add(stego_member(index), png)
+        writer.add(KEYS_MEMBER, key_blob)
+    return path
@@ -1,64 +1,616 @@
+import itertools
+import os
 import random
 import struct
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 from src.crypto.aes_cipher import encrypt_aes, decrypt_aes
 from src.crypto.chacha_cipher import encrypt_chacha, decrypt_chacha
 from src.crypto.ascon_cipher import encrypt_ascon, decrypt_ascon
+from src.utils.wire_format import (
+    WIRE_FORMAT_V1, WIRE_FORMAT_V2, V2_HEADER_LEN, V2_OVERHEAD,
+    FLAG_TEXT, FLAG_CODEC_SHIFT, FLAG_CODEC_MASK, FLAG_FINAL,
+    SeqIdKeystream, new_salt, is_v2_payload, payload_overhead, encrypt_chunk_v2, decrypt_chunk_v2,
+    seal_chunk_v2, open_chunk_v2, parse_v2_header, payload_suite,
+)
+from src.crypto.suites import SUITE_TRI_HYBRID, get_suite
+from src.utils.compression import CODEC_NONE, StreamInflater, compress_adaptive, decompress
 
-def split_and_prepare_payloads(message, num_parts, inner_key, outer_key, ctr_key):
+# Bytes each payload adds on top of its chunk text:
+#   AES-CTR nonce(8) + seq ID(4) + ASCON nonce(16) + ChaCha20 nonce(8) + ASCON tag(16)
+PAYLOAD_OVERHEAD = 52
+PAYLOAD_OVERHEAD_V2 = V2_OVERHEAD
+# A split point may move back up to 3 bytes to land on a UTF-8 character boundary
+UTF8_SPLIT_SLACK = 3
+
+# Worker pools for chunk-parallel encryption / decryption
+POOL_THREAD = "thread"      # enough when pycryptodome does the work (it releases the GIL)
+POOL_PROCESS = "process"    # needed to spread the pure-Python ASCON layer over cores
+POOL_AUTO = "auto"          # processes for the tri-hybrid suite, threads for the AEAD suites
+
+def _resolve_pool(pool, suite):
+    """Turns POOL_AUTO into the pool kind that suits the cipher suite."""
+    if pool != POOL_AUTO:
+        return pool
+    return POOL_PROCESS if get_suite(suite).suite_id == SUITE_TRI_HYBRID else POOL_THREAD
+
+def _chunk_pool(max_workers, pool):
+    if pool == POOL_THREAD:
+        return ThreadPoolExecutor(max_workers=max_workers)
+    if pool == POOL_PROCESS:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"Unknown pool kind: {pool}")
+
+def _map_chunks(fn, jobs, max_workers=1, pool=POOL_THREAD, executor=None, window=None, check=None):
+    """
+    Calls fn(*job) for every job and returns the results in job order;
+    check(index, result), if given, runs in the calling thread on each
+    result as it finishes and returns the value to keep (or raises).
+    With 1 worker or a single job (and no executor) everything runs
+    in-process. Otherwise jobs are pulled from the jobs iterable only as
+    room frees up in a window of `window` in-flight jobs (default 2 per
+    worker), and every result is checked as soon as it finishes: the first
+    failure re-raises here, no further jobs are pulled, and the jobs that
+    have not started yet are cancelled.
+    """
+    check = check or (lambda index, result: result)
+    jobs = iter(jobs)
+    head = list(itertools.islice(jobs, 2))
+    if executor is None and (max_workers <= 1 or len(head) <= 1):
+        return [check(index, fn(*job)) for index, job in enumerate(itertools.chain(head, jobs))]
+
+    window = window or 2 * max_workers
+    own_executor = executor is None
+    if own_executor:
+        executor = _chunk_pool(max_workers, pool)
+    results = []
+    in_flight = {}
+
+    def collect(timeout=None):
+        done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = in_flight.pop(future)
+            results[index] = check(index, future.result())
+
+    try:
+        for index, job in enumerate(itertools.chain(head, jobs)):
+            while len(in_flight) >= window:
+                collect()
+            results.append(None)
+            in_flight[executor.submit(fn, *job)] = index
+            collect(timeout=0)
+        while in_flight:
+            collect()
+        return results
+    finally:
+        for future in in_flight:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def encrypt_chunk(seq_id, chunk_text, inner_key, outer_key, ctr_key):
+    """
+    Encrypts a single chunk: ChaCha20 -> ASCON-128, plus the AES-CTR sequence ID.
+    Returns:
+        tuple: (enc_seq_id, double_enc_content)
+    """
+    inner_data = encrypt_chacha(chunk_text, inner_key)
+    double_enc_content = encrypt_ascon(inner_data, outer_key)
+    seq_bytes = struct.pack('>I', seq_id)
+    enc_seq_id = encrypt_aes(seq_bytes, ctr_key)
+    return enc_seq_id, double_enc_content
+
+def plan_chunk_sizes(total_len, capacities, overhead=PAYLOAD_OVERHEAD, slack=0):
+    """
+    Picks the fewest covers that can carry the message and sizes their
+    chunks proportionally to each cover's capacity. The largest covers are
+    filled first; covers that are not needed, or too small to hold any
+    data after the per-chunk overhead, are left out instead of failing.
+    Args:
+        total_len (int): Message length in bytes.
+        capacities (list[int]): Payload bytes each cover can hold.
+        overhead (int): Per-payload encryption overhead in bytes.
+        slack (int): Extra bytes to keep free in every cover.
+    Returns:
+        list[int | None]: Chunk size for each cover (None = cover unused);
+        the sizes sum to total_len.
+    """
+    usable = [capacity - overhead - slack for capacity in capacities]
+    by_size = sorted((i for i in range(len(usable)) if usable[i] > 0), key=lambda i: usable[i], reverse=True)
+    chosen, total_usable = [], 0
+    for i in by_size:
+        if chosen and total_usable >= total_len:
+            break
+        chosen.append(i)
+        total_usable += usable[i]
+    if not chosen or total_len > total_usable:
+        raise ValueError(f"Covers are too small! Message needs {total_len} bytes, covers hold {total_usable}.")
+    if len(chosen) < len(usable):
+        print(f"[INFO] Using {len(chosen)} of {len(usable)} covers.")
+
+    sizes = [None] * len(usable)
+    for i in chosen:
+        sizes[i] = total_len * usable[i] // total_usable
+    # Hand the rounding remainder to the covers with the largest fractional share
+    by_remainder = sorted(chosen, key=lambda i: (total_len * usable[i]) % total_usable, reverse=True)
+    short = total_len - sum(sizes[i] for i in chosen)
+    while short:
+        for i in by_remainder:
+            if short and sizes[i] < usable[i]:
+                sizes[i] += 1
+                short -= 1
+    return sizes
+
+def _split_text_by_size(message, sizes):
+    """Cuts a str into chunks of ~sizes[i] UTF-8 bytes without splitting a character."""
+    data = message.encode('utf-8')
+    chunks, start, boundary = [], 0, 0
+    for size in sizes:
+        boundary += size
+        end = boundary
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        chunks.append(data[start:end].decode('utf-8'))
+        start = end
+    return chunks
+
+def _split_bytes_by_size(data, sizes):
+    """Cuts bytes into consecutive chunks of sizes[i] bytes."""
+    chunks, start = [], 0
+    for size in sizes:
+        chunks.append(data[start:start + size])
+        start += size
+    return chunks
+
+def _encrypt_chunks_v2(chunks, inner_key, outer_key, ctr_key, flags, suite, max_workers=1, pool=POOL_THREAD, executor=None):
+    """
+    Encrypts all chunks of one message in the compact format. The sequence
+    IDs are masked here, so the workers only need to seal their chunk.
+    """
+    salt = new_salt()
+    keystream = SeqIdKeystream(ctr_key, salt, len(chunks))
+    jobs = []
+    for seq_id, chunk in enumerate(chunks):
+        print(f"[INFO] Chunk {seq_id + 1}/{len(chunks)}: {suite.name} (compact)")
+        chunk_flags = flags | FLAG_FINAL if seq_id == len(chunks) - 1 else flags
+        jobs.append((seq_id, keystream.encrypt(seq_id), chunk, inner_key, outer_key, salt, chunk_flags, suite.suite_id))
+    return _map_chunks(seal_chunk_v2, jobs, max_workers, _resolve_pool(pool, suite), executor)
+
+def split_and_prepare_payloads(message, num_parts, inner_key, outer_key, ctr_key, capacities=None, wire_format=WIRE_FORMAT_V1, compress=False, suite=SUITE_TRI_HYBRID, max_workers=1, pool=POOL_THREAD, executor=None):
     """
     Splits message and applies Tri-Hybrid Encryption:
     1. Content: ChaCha20 (Inner) -> ASCON-128 (Outer)
     2. Sequence ID: AES-128 (CTR Mode)
+
+    Without capacities the message is cut into equal pieces and the payloads
+    are shuffled. With capacities (payload bytes each cover holds, e.g. from
+    lsb_engine.cover_capacity) only the fewest, largest covers the message
+    needs are used (see plan_chunk_sizes); chunks are assigned to them in
+    random order and sized proportionally to each cover. payloads[i] then
+    fits cover i, and is None for a cover that is not needed.
+
+    wire_format=WIRE_FORMAT_V2 emits the compact format (see wire_format.py):
+    derived nonces, one AES-CTR pass for all sequence IDs and 33 instead of
+    52 bytes of overhead per chunk.
+
+    compress=True (compact format only) compresses the whole message with
+    the best stdlib codec before chunking; the codec is recorded in the
+    header flags and skipped when the message does not shrink.
+
+    suite (compact format only) selects the cipher suite by ID or name from
+    src/crypto/suites.py; the tri-hybrid pipeline is the default and the
+    suite ID travels in every payload header.
+
+    max_workers > 1 (or an existing executor) encrypts the chunks in
+    parallel on a thread pool, or a process pool with pool=POOL_PROCESS
+    (worth it for the tri-hybrid suite, whose ASCON layer holds the GIL);
+    pool=POOL_AUTO picks between the two by suite. A single chunk is
+    always encrypted in-process. The output is identical to the serial run.
     """
-    n = len(message)
-    k = num_parts
-    chunk_size = (n + k - 1) // k
-    chunks = [message[i:i + chunk_size] for i in range(0, n, chunk_size)]
-    while len(chunks) < num_parts:
-        chunks.append("") 
+    compact = wire_format == WIRE_FORMAT_V2
+    if not compact and wire_format != WIRE_FORMAT_V1:
+        raise ValueError(f"Unknown wire format: {wire_format}")
+    if compress and not compact:
+        raise ValueError("Compression requires the compact (v2) wire format.")
+    suite = get_suite(suite)
+    if suite.suite_id != SUITE_TRI_HYBRID and not compact:
+        raise ValueError(f"Cipher suite {suite.name} requires the compact (v2) wire format.")
+
+    flags = FLAG_TEXT
+    if compact:
+        message = message.encode('utf-8')
+        if compress:
+            codec, message = compress_adaptive(message)
+            flags |= codec << FLAG_CODEC_SHIFT
+            print(f"[INFO] Compression codec {codec}: {len(message)} bytes to encrypt.")
+
+    if capacities is not None:
+        if len(capacities) != num_parts:
+            raise ValueError(f"Got {len(capacities)} capacities for {num_parts} parts.")
+        if compact:
+            cover_sizes = plan_chunk_sizes(len(message), capacities, overhead=payload_overhead(suite))
+        else:
+            cover_sizes = plan_chunk_sizes(len(message.encode('utf-8')), capacities, slack=UTF8_SPLIT_SLACK)
+        cover_for_seq = [c for c in range(num_parts) if cover_sizes[c] is not None]
+        random.shuffle(cover_for_seq)
+        sizes = [cover_sizes[c] for c in cover_for_seq]
+        if compact:
+            chunks = _split_bytes_by_size(message, sizes)
+        else:
+            chunks = _split_text_by_size(message, sizes)
+    else:
+        n = len(message)
+        k = num_parts
+        chunk_size = max(1, (n + k - 1) // k)
+        chunks = [message[i:i + chunk_size] for i in range(0, n, chunk_size)]
+        while len(chunks) < num_parts:
+            chunks.append(message[:0]) 
 
-    payloads = []
     print(f"[INFO] Split into {len(chunks)} chunks.")
     print("[INFO] Encrypting chunks...")
 
-    for seq_id, chunk_text in enumerate(chunks):
-        print(f"[INFO] Chunk {seq_id + 1}/{len(chunks)}: ChaCha20 -> ASCON -> AES-CTR ID")
-        inner_data = encrypt_chacha(chunk_text, inner_key)
-        double_enc_content = encrypt_ascon(inner_data, outer_key)
-        seq_bytes = struct.pack('>I', seq_id)
-        enc_seq_id = encrypt_aes(seq_bytes, ctr_key)
-        payloads.append((enc_seq_id, double_enc_content))
+    if compact:
+        payloads = _encrypt_chunks_v2(chunks, inner_key, outer_key, ctr_key, flags, suite, max_workers, pool, executor)
+    else:
+        jobs = []
+        for seq_id, chunk_text in enumerate(chunks):
+            print(f"[INFO] Chunk {seq_id + 1}/{len(chunks)}: ChaCha20 -> ASCON -> AES-CTR ID")
+            jobs.append((seq_id, chunk_text, inner_key, outer_key, ctr_key))
+        payloads = _map_chunks(encrypt_chunk, jobs, max_workers, _resolve_pool(pool, SUITE_TRI_HYBRID), executor)
+
+    if capacities is not None:
+        print("[INFO] Placing payloads on their covers...")
+        placed = [None] * num_parts
+        for seq_id, payload in enumerate(payloads):
+            placed[cover_for_seq[seq_id]] = payload
+        print("[INFO] Payloads ready.")
+        return placed
 
     print("[INFO] Shuffling payloads...")
     random.shuffle(payloads)
     print("[INFO] Payloads ready.")
     return payloads
 
-def reassemble_payloads(shuffled_payloads, inner_key, outer_key, ctr_key):
+def decrypt_payload(enc_seq_id, double_enc_content, inner_key, outer_key, ctr_key, decode=True):
     """
-    Decrypts AES IDs to sort, then unwraps ASCON -> ChaCha content.
+    Decrypts a single payload: AES-CTR ID -> ASCON verify -> ChaCha20.
+    Returns:
+        tuple: (seq_id, chunk_text), with chunk bytes instead of text when
+        decode is False. Raises ValueError on tampering.
     """
-    decrypted_parts = []
-    print(f"[INFO] Reassembling {len(shuffled_payloads)} payloads...")
+    seq_bytes = decrypt_aes(enc_seq_id, ctr_key)
+    if seq_bytes is None or len(seq_bytes) != 4:
+        raise ValueError("TAMPER ALERT: Sequence ID corrupted!")
+    seq_id = struct.unpack('>I', seq_bytes)[0]
+
+    inner_data = decrypt_ascon(double_enc_content, outer_key)
+    if inner_data is None:
+        raise ValueError(f"TAMPER ALERT: ASCON Layer failed for chunk {seq_id}.")
+
+    chunk_text = decrypt_chacha(inner_data, inner_key, decode=decode)
+    if chunk_text is None:
+        raise ValueError(f"ERROR: ChaCha Layer failed for chunk {seq_id}.")
+    return seq_id, chunk_text
+
+def _decrypt_any(enc_seq_id, content, inner_key, outer_key, ctr_key, decode, keystreams, expected_chunks):
+    """
+    Decrypts a payload in either wire format.
+    Returns:
+        tuple: (seq_id, chunk, flags) where flags is None for v1 payloads.
+    """
+    if is_v2_payload(enc_seq_id):
+        known = set(keystreams)
+        try:
+            seq_id, chunk, flags = decrypt_chunk_v2(
+                bytes(enc_seq_id) + bytes(content), inner_key, outer_key, ctr_key,
+                keystreams, expected_chunks,
+            )
+        except ValueError as v2_error:
+            # About 1 in 2^24 v1 payloads starts with the v2 magic by chance;
+            # forget the salt read from its random bytes and try it as v1
+            for salt in set(keystreams) - known:
+                del keystreams[salt]
+            try:
+                seq_id, chunk = decrypt_payload(enc_seq_id, content, inner_key, outer_key, ctr_key, decode=decode)
+            except ValueError:
+                raise v2_error from None
+            return seq_id, chunk, None
+        if len(keystreams) > 1:
+            raise ValueError("TAMPER ALERT: Chunks belong to different messages.")
+        return seq_id, chunk, flags
+    seq_id, chunk = decrypt_payload(enc_seq_id, content, inner_key, outer_key, ctr_key, decode=decode)
+    return seq_id, chunk, None
+
+def _payload_label(enc_seq_id, content):
+    """Log label naming the layers a payload is opened with."""
+    if not is_v2_payload(enc_seq_id):
+        return "AES-CTR ID -> ASCON -> ChaCha20"
+    try:
+        return f"{payload_suite(bytes(enc_seq_id) + bytes(content[:V2_HEADER_LEN])).name} (compact)"
+    except ValueError:
+        return "unknown suite (compact)"
+
+def _decrypt_job(enc_seq_id, content, inner_key, outer_key, ctr_key, seq_ids):
+    """
+    Worker entry point. v1 payloads (seq_ids None) are fully decrypted;
+    compact ones are only tried against the candidate IDs resolved by the
+    caller and give None if none of them authenticates.
+    """
+    if seq_ids is None:
+        seq_id, chunk = decrypt_payload(enc_seq_id, content, inner_key, outer_key, ctr_key)
+        return seq_id, chunk, None
+    return open_chunk_v2(bytes(enc_seq_id) + bytes(content), inner_key, outer_key, seq_ids)
+
+def _decrypt_parallel(payloads, inner_key, outer_key, ctr_key, expected_chunks, max_workers, pool, executor):
+    """
+    Decrypts payloads over a worker pool; returns (seq_id, chunk, flags) in
+    arrival order. Compact sequence IDs are resolved here, since the shared
+    keystream cache is not safe to grow from several workers.
+    """
+    keystreams = {}
+    received = []
+    payloads = iter(payloads)
+    first = next(payloads, None)
+    if first is None:
+        return []
+    if pool == POOL_AUTO:
+        try:
+            suite = payload_suite(bytes(first[0]) + bytes(first[1][:V2_HEADER_LEN]))
+        except ValueError:
+            suite = SUITE_TRI_HYBRID    # unknown suite ID: the tamper alert comes from the retry
+        pool = _resolve_pool(pool, suite)
+
+    def jobs():
+        for index, (enc_seq_id, content) in enumerate(itertools.chain([first], payloads), start=1):
+            print(f"[INFO] Payload {index}: {_payload_label(enc_seq_id, content)}")
+            received.append((enc_seq_id, content))
+            seq_ids = None
+            if is_v2_payload(enc_seq_id):
+                # Anything unexpected (short header, a second salt) gets no
+                # candidates; the serial retry below sorts out v1 payloads
+                # that merely look compact and raises the tamper alerts
+                seq_ids = []
+                parsed = parse_v2_header(bytes(enc_seq_id) + bytes(content))
+                if parsed is not None:
+                    _, _, salt, enc_id = parsed
+                    if salt in keystreams or not keystreams:
+                        keystream = keystreams.get(salt)
+                        if keystream is None:
+                            keystream = keystreams[salt] = SeqIdKeystream(ctr_key, salt, expected_chunks)
+                        seq_ids = keystream.candidates(enc_id)
+            yield enc_seq_id, content, inner_key, outer_key, ctr_key, seq_ids
+
+    def check(index, part):
+        if part is None:
+            # No likely ID opened it: retry exhaustively and as v1 (raises the tamper alert)
+            enc_seq_id, content = received[index]
+            part = _decrypt_any(
+                enc_seq_id, content, inner_key, outer_key, ctr_key, True, keystreams, expected_chunks,
+            )
+        return part
+
+    return _map_chunks(_decrypt_job, jobs(), max_workers, pool, executor, check=check)
+
+def _check_complete(seq_ids, final_ids, expected_chunks=None):
+    """
+    Raises unless seq_ids (sorted) are exactly 0..n-1 and the message end
+    is accounted for: final_ids holds the sequence IDs of compact chunks
+    flagged FLAG_FINAL (at most one, the last), expected_chunks an optional
+    chunk count known to the caller.
+    """
+    for position, seq_id in enumerate(seq_ids):
+        if seq_id != position:
+            if seq_id < position:
+                raise ValueError(f"TAMPER ALERT: Duplicate chunk {seq_id}.")
+            raise ValueError(f"ERROR: Missing chunk {position}; cannot complete the message.")
+    if len(final_ids) > 1:
+        raise ValueError("TAMPER ALERT: Message has more than one final chunk.")
+    if final_ids and final_ids[0] != len(seq_ids) - 1:
+        raise ValueError(f"TAMPER ALERT: Chunk {final_ids[0] + 1} follows the final chunk.")
+    if expected_chunks is not None and len(seq_ids) != expected_chunks:
+        raise ValueError(f"ERROR: Got {len(seq_ids)} of {expected_chunks} chunks; cannot complete the message.")
+
+def reassemble_payload_stream(payloads, inner_key, outer_key, ctr_key, expected_chunks=64, max_workers=1, pool=POOL_THREAD, executor=None):
+    """
+    Like reassemble_payloads, but consumes any iterable of payloads and
+    decrypts each one as soon as it is produced. Fed by a generator (e.g.
+    parallel LSB extraction), decryption overlaps with the producer, and the
+    first tamper alert stops consumption immediately.
+    Both the original and the compact (v2) wire formats are accepted.
+    max_workers / pool / executor decrypt the chunks in parallel, as in
+    split_and_prepare_payloads.
+    """
+    if executor is not None or max_workers > 1:
+        decrypted_parts = _decrypt_parallel(
+            payloads, inner_key, outer_key, ctr_key, expected_chunks, max_workers, pool, executor,
+        )
+    else:
+        decrypted_parts = []
+        keystreams = {}
+        for index, (enc_seq_id, double_enc_content) in enumerate(payloads, start=1):
+            print(f"[INFO] Payload {index}: {_payload_label(enc_seq_id, double_enc_content)}")
+            decrypted_parts.append(_decrypt_any(
+                enc_seq_id, double_enc_content, inner_key, outer_key, ctr_key,
+                True, keystreams, expected_chunks,
+            ))
 
-    for index, (enc_seq_id, double_enc_content) in enumerate(shuffled_payloads, start=1):
-        print(f"[INFO] Payload {index}/{len(shuffled_payloads)}: AES-CTR ID -> ASCON -> ChaCha20")
-        seq_bytes = decrypt_aes(enc_seq_id, ctr_key)
-        if seq_bytes is None:
-            raise ValueError("TAMPER ALERT: Sequence ID corrupted!")
-        seq_id = struct.unpack('>I', seq_bytes)[0]
-
-        inner_data = decrypt_ascon(double_enc_content, outer_key)
-        if inner_data is None:
-            raise ValueError(f"TAMPER ALERT: ASCON Layer failed for chunk {seq_id}.")
-
-        chunk_text = decrypt_chacha(inner_data, inner_key)
-        if chunk_text is None:
-            raise ValueError(f"ERROR: ChaCha Layer failed for chunk {seq_id}.")
-        decrypted_parts.append((seq_id, chunk_text))
-        
     print("[INFO] Sorting chunks...")
     decrypted_parts.sort(key=lambda x: x[0])
+    final_ids = [part[0] for part in decrypted_parts if part[2] is not None and part[2] & FLAG_FINAL]
+    if not final_ids and any(part[2] is not None for part in decrypted_parts):
+        raise ValueError("ERROR: The final chunk is missing; cannot complete the message.")
+    _check_complete([part[0] for part in decrypted_parts], final_ids)
     print("[INFO] Joining chunks...")
-    return "".join(part[1] for part in decrypted_parts)
\ No newline at end of file
+    flags = {part[2] & ~FLAG_FINAL if part[2] is not None else None for part in decrypted_parts}
+    if len(flags) > 1:
+        raise ValueError("TAMPER ALERT: Chunks use mixed wire formats.")
+    if not decrypted_parts or flags == {None}:
+        return "".join(part[1] for part in decrypted_parts)
+    flags = flags.pop()
+    data = decompress(
+        (flags & FLAG_CODEC_MASK) >> FLAG_CODEC_SHIFT,
+        b"".join(part[1] for part in decrypted_parts),
+    )
+    return data.decode('utf-8') if flags & FLAG_TEXT else data
+
+def reassemble_payloads(shuffled_payloads, inner_key, outer_key, ctr_key, max_workers=1, pool=POOL_THREAD, executor=None):
+    """
+    Decrypts AES IDs to sort, then unwraps ASCON -> ChaCha content.
+    """
+    print(f"[INFO] Reassembling {len(shuffled_payloads)} payloads...")
+    return reassemble_payload_stream(
+        shuffled_payloads, inner_key, outer_key, ctr_key,
+        expected_chunks=max(1, len(shuffled_payloads)),
+        max_workers=max_workers, pool=pool, executor=executor,
+    )
+
+def _positive_sizes(sizes):
+    for size in sizes:
+        if size <= 0:
+            raise ValueError(f"Chunk size must be positive, got {size}.")
+        yield size
+
+def _read_chunks(source, sizes):
+    """
+    Yields successive byte chunks of the requested sizes from a path, a
+    bytes-like object, a binary file object or an iterable of byte pieces.
+    Only one chunk (plus at most one partial piece) is held at a time.
+    Raises:
+        ValueError: If a requested size is not positive.
+    """
+    sizes = _positive_sizes(sizes)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view, offset = memoryview(source), 0
+        for size in sizes:
+            if offset >= len(view):
+                return
+            yield bytes(view[offset:offset + size])
+            offset += size
+        return
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield from _read_chunks(f, sizes)
+        return
+
+    if hasattr(source, "read"):
+        for size in sizes:
+            chunk = source.read(size)
+            if not chunk:
+                return
+            yield chunk
+        return
+
+    pieces, buf = iter(source), bytearray()
+    for size in sizes:
+        while len(buf) < size:
+            piece = next(pieces, None)
+            if piece is None:
+                break
+            buf += piece
+        if not buf:
+            return
+        yield bytes(buf[:size])
+        del buf[:size]
+
+def iter_prepare_payloads(source, chunk_size, inner_key, outer_key, ctr_key, wire_format=WIRE_FORMAT_V1, suite=SUITE_TRI_HYBRID, text=False):
+    """
+    Streaming, bytes-native variant of split_and_prepare_payloads.
+    Reads the payload lazily and yields one encrypted chunk at a time, so the
+    caller can embed and release each chunk before the next one is read.
+    Payloads come out in sequence order; the sequence IDs are still
+    AES-CTR encrypted, so callers may place them on covers in any order.
+    Args:
+        source: Path, bytes-like object, binary file object or iterable of
+            byte pieces.
+        chunk_size (int | iterable[int]): Plaintext bytes per chunk, either
+            fixed or one size per chunk (e.g. cover capacity minus
+            PAYLOAD_OVERHEAD / PAYLOAD_OVERHEAD_V2).
+        wire_format (int): WIRE_FORMAT_V1 or WIRE_FORMAT_V2 (compact).
+        suite: Cipher suite ID or name (compact format only).
+        text (bool): Flag compact payloads as UTF-8 text, so reassembly
+            returns a str (chunks may still split a character).
+    Yields:
+        tuple: (enc_seq_id, double_enc_content)
+    """
+    if wire_format not in (WIRE_FORMAT_V1, WIRE_FORMAT_V2):
+        raise ValueError(f"Unknown wire format: {wire_format}")
+    suite = get_suite(suite)
+    if suite.suite_id != SUITE_TRI_HYBRID and wire_format != WIRE_FORMAT_V2:
+        raise ValueError(f"Cipher suite {suite.name} requires the compact (v2) wire format.")
+    sizes = itertools.repeat(chunk_size) if isinstance(chunk_size, int) else iter(chunk_size)
+    if wire_format == WIRE_FORMAT_V2:
+        salt = new_salt()
+        keystream = SeqIdKeystream(ctr_key, salt)
+        flags = FLAG_TEXT if text else 0
+        # Read one chunk ahead so the last one can be flagged FLAG_FINAL; an
+        # empty source still yields one (empty) final chunk
+        chunks = _read_chunks(source, sizes)
+        chunk, seq_id = next(chunks, b""), 0
+        while chunk is not None:
+            following = next(chunks, None)
+            chunk_flags = flags | FLAG_FINAL if following is None else flags
+            yield encrypt_chunk_v2(seq_id, chunk, inner_key, outer_key, salt, keystream, chunk_flags, suite)
+            chunk, seq_id = following, seq_id + 1
+        return
+    for seq_id, chunk in enumerate(_read_chunks(source, sizes)):
+        yield encrypt_chunk(seq_id, chunk, inner_key, outer_key, ctr_key)
+
+def reassemble_to_stream(payloads, sink, inner_key, outer_key, ctr_key, expected_chunks=None):
+    """
+    Streaming, bytes-native variant of reassemble_payloads.
+    Decrypts payloads (either wire format) in whatever order they arrive and
+    writes each chunk to sink as soon as every earlier chunk has been
+    written; only out-of-order chunks are buffered. Compressed compact
+    messages are inflated incrementally on the way to the sink, with the
+    same MAX_DECOMPRESSED_SIZE cap and end-of-stream check as decompress().
+    A compact message is complete once its FLAG_FINAL chunk and every chunk
+    before it have arrived; v1 payloads carry no end marker, so a dropped
+    tail is only detected when expected_chunks is given.
+    Args:
+        payloads: Iterable of (enc_seq_id, double_enc_content).
+        sink: Binary file object (anything with write()).
+        expected_chunks (int): Optional number of chunks the message has.
+    Returns:
+        int: Number of plaintext bytes written.
+    Raises:
+        ValueError: On tampering, or if any chunk (including the last)
+            is missing.
+    """
+    pending = {}
+    keystreams = {}
+    inflater = None
+    final_ids = []
+    compact = False
+    next_id = 0
+    written = 0
+    for enc_seq_id, double_enc_content in payloads:
+        seq_id, chunk, flags = _decrypt_any(
+            enc_seq_id, double_enc_content, inner_key, outer_key, ctr_key,
+            False, keystreams, expected_chunks or 64,
+        )
+        if seq_id < next_id or seq_id in pending:
+            raise ValueError(f"TAMPER ALERT: Duplicate chunk {seq_id}.")
+        if flags is not None:
+            compact = True
+            if flags & FLAG_FINAL:
+                final_ids.append(seq_id)
+        codec = (flags & FLAG_CODEC_MASK) >> FLAG_CODEC_SHIFT if flags else CODEC_NONE
+        if codec != CODEC_NONE and inflater is None:
+            inflater = StreamInflater(codec)
+        pending[seq_id] = chunk
+        while next_id in pending:
+            chunk = pending.pop(next_id)
+            for piece in inflater.feed(chunk) if inflater is not None else (chunk,):
+                sink.write(piece)
+                written += len(piece)
+            next_id += 1
+
+    if pending:
+        raise ValueError(f"ERROR: Missing chunk {next_id}; cannot complete the stream.")
+    if compact and not final_ids:
+        raise ValueError(f"ERROR: Missing chunk {next_id}; the final chunk never arrived.")
+    _check_complete(range(next_id), final_ids, expected_chunks)
+    if inflater is not None:
+        inflater.finish()
+    return written
@@ -0,0 +1,134 @@
+import bz2
+import lzma
+import zlib
+
+# Codec IDs, stored in the compact payload header flags
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_LZMA = 2
+CODEC_BZ2 = 3
+
+# Raw LZMA2 stream: avoids the ~60-byte .xz container on short messages.
+# The decoder accepts any dictionary up to preset 9's 64 MiB; the encoder
+# sizes its dictionary to the input, since setting up the full preset 9
+# dictionary alone takes ~40 ms.
+_LZMA_FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 9}]
+LZMA_MIN_DICT = 4096
+LZMA_MAX_DICT = 64 * 1024 * 1024
+
+# Below this size only zlib is tried: bz2's block header never pays off
+# and the LZMA trial would cost more than it could save
+SMALL_INPUT_SIZE = 512
+
+# Above this size the codec is picked from a leading sample only
+SAMPLE_SIZE = 256 * 1024
+# Refuse to inflate a message beyond this many bytes
+MAX_DECOMPRESSED_SIZE = 256 * 1024 * 1024
+# Largest piece StreamInflater hands out at once
+INFLATE_PIECE_SIZE = 1024 * 1024
+
+def _lzma_filters(size):
+    """Preset 9 LZMA2 with a dictionary just large enough for size bytes."""
+    dict_size = min(max(LZMA_MIN_DICT, 1 << (size - 1).bit_length()), LZMA_MAX_DICT)
+    return [{"id": lzma.FILTER_LZMA2, "preset": 9, "dict_size": dict_size}]
+
+_COMPRESSORS = {
+    CODEC_ZLIB: lambda data: zlib.compress(data, 9),
+    CODEC_LZMA: lambda data: lzma.compress(data, format=lzma.FORMAT_RAW, filters=_lzma_filters(len(data))),
+    CODEC_BZ2: lambda data: bz2.compress(data, 9),
+}
+
+def decompressor(codec):
+    """
+    Returns an incremental decompressor for codec: an object whose
+    decompress(data, max_length) returns the next piece of plaintext.
+    """
+    if codec == CODEC_ZLIB:
+        return zlib.decompressobj()
+    if codec == CODEC_LZMA:
+        return lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+    if codec == CODEC_BZ2:
+        return bz2.BZ2Decompressor()
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+class StreamInflater:
+    """
+    Incremental decompression with the same guarantees as decompress():
+    output is capped at max_size bytes and finish() rejects a stream that
+    ends early or has data after its end.
+    """
+
+    def __init__(self, codec, max_size=MAX_DECOMPRESSED_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self._inflater = decompressor(codec)
+
+    def feed(self, data):
+        """Yields the plaintext pieces (at most INFLATE_PIECE_SIZE each) that data completes."""
+        inflater = self._inflater
+        data = bytes(data)
+        while True:
+            if inflater.eof:
+                if data or inflater.unused_data:
+                    raise ValueError("Decompression failed: data after the end of the compressed stream.")
+                return
+            limit = min(self.max_size - self.size + 1, INFLATE_PIECE_SIZE)
+            try:
+                piece = inflater.decompress(data, limit)
+            except (zlib.error, lzma.LZMAError, OSError, EOFError) as e:
+                raise ValueError(f"Decompression failed: {e}")
+            self.size += len(piece)
+            if self.size > self.max_size:
+                raise ValueError(f"Decompressed message exceeds {self.max_size} bytes.")
+            if piece:
+                yield piece
+            if hasattr(inflater, "unconsumed_tail"):
+                # zlib keeps input it could not process within the limit
+                data = inflater.unconsumed_tail
+                if not data and len(piece) < limit and not inflater.eof:
+                    return
+            else:
+                data = b""
+                if inflater.needs_input and not inflater.eof:
+                    return
+
+    def finish(self):
+        """Raises unless the compressed stream ended exactly."""
+        if not self._inflater.eof:
+            raise ValueError("Decompression failed: compressed stream is truncated.")
+
+def compress_adaptive(data):
+    """
+    Compresses data with whichever stdlib codec gives the smallest output.
+    Large inputs pick the codec from a leading sample and only compress the
+    whole message once; inputs under SMALL_INPUT_SIZE only try zlib.
+    Returns:
+        tuple: (codec, payload). codec is CODEC_NONE and payload is data
+        unchanged when no codec makes it smaller.
+    """
+    data = bytes(data)
+    sample = data[:SAMPLE_SIZE]
+    codecs = [CODEC_ZLIB] if len(data) < SMALL_INPUT_SIZE else list(_COMPRESSORS)
+    trials = {codec: _COMPRESSORS[codec](sample) for codec in codecs}
+    codec = min(trials, key=lambda c: len(trials[c]))
+    if len(trials[codec]) >= len(sample):
+        return CODEC_NONE, data
+
+    payload = trials[codec] if len(data) <= SAMPLE_SIZE else _COMPRESSORS[codec](data)
+    if len(payload) >= len(data):
+        return CODEC_NONE, data
+    return codec, payload
+
+def decompress(codec, payload, max_size=MAX_DECOMPRESSED_SIZE):
+    """
+    Reverses compress_adaptive.
+    Raises:
+        ValueError: if the codec is unknown, the stream is corrupt or
+        truncated, or the output would exceed max_size bytes.
+    """
+    if codec == CODEC_NONE:
+        return bytes(payload)
+    inflater = StreamInflater(codec, max_size)
+    data = b"".join(inflater.feed(payload))
+    inflater.finish()
+    return data
@@ -0,0 +1,192 @@
+import os
+import struct
+
+from src.crypto.aes_cipher import aes_ctr_keystream
+from src.crypto.suites import SUITE_TRI_HYBRID, get_suite
+
+# Payload wire formats understood by chunk_manager
+WIRE_FORMAT_V1 = 1   # enc_seq_id(12) + ASCON nonce(16) + [ChaCha nonce(8) + ct] + tag(16)
+WIRE_FORMAT_V2 = 2   # compact format below
+
+# Compact (v2) payload layout:
+#   header: magic(2) + version(1) + suite(1) + flags(1) + salt(8) + enc_seq_id(4)
+#   body:   chunk sealed by the cipher suite named in the header (see
+#           src/crypto/suites.py); the default tri-hybrid suite is
+#           ASCON-128(ChaCha20(chunk)) ciphertext + tag(16)
+# The suite's nonces are derived from the per-message salt and the sequence
+# ID, so they are never embedded. The header is authenticated as associated
+# data.
+V2_MAGIC = b"SW"
+V2_HEADER_FORMAT = ">2sBBB8s4s"
+V2_HEADER_LEN = struct.calcsize(V2_HEADER_FORMAT)
+V2_OVERHEAD = V2_HEADER_LEN + 16    # with a 16-byte tag (all built-in suites)
+SALT_LEN = 8
+
+# Header flags
+FLAG_TEXT = 0x01         # joined plaintext is UTF-8 text
+FLAG_CODEC_SHIFT = 1     # bits 1-2: compression codec (see compression.py)
+FLAG_CODEC_MASK = 0x06
+FLAG_FINAL = 0x08        # last chunk of the message (detects a dropped tail)
+
+# Upper bound on chunks per message; also bounds the work spent on a bad ID
+MAX_CHUNKS = 1 << 16
+
+def new_salt():
+    """Returns a fresh per-message salt."""
+    return os.urandom(SALT_LEN)
+
+def is_v2_payload(data):
+    """True if data starts with a compact (v2) payload header."""
+    return bytes(data[:3]) == V2_MAGIC + bytes([WIRE_FORMAT_V2])
+
+def payload_suite(data):
+    """
+    Returns the cipher suite a payload (or its leading bytes) was sealed
+    with: the one named in a compact header, tri-hybrid for v1 payloads.
+    """
+    parsed = parse_v2_header(data)
+    return get_suite(parsed[0] if parsed is not None else SUITE_TRI_HYBRID)
+
+def payload_overhead(suite=SUITE_TRI_HYBRID):
+    """Bytes a compact payload adds on top of its chunk for the given suite."""
+    return V2_HEADER_LEN + get_suite(suite).tag_len
+
+class SeqIdKeystream:
+    """
+    Obfuscates the sequence IDs of one message with a single AES-CTR
+    keystream: 4-byte slot j of the keystream masks sequence ID j. The
+    keystream for all chunks is produced in one pass (and regenerated at
+    twice the size when more slots are needed), instead of one AES-CTR
+    cipher per chunk.
+    """
+
+    def __init__(self, ctr_key, salt, slots=64):
+        self._ctr_key = ctr_key
+        self._salt = salt
+        self._slots = 0
+        self._masks = b""
+        self._table = {}
+        self._grow(max(1, slots))
+
+    def _grow(self, slots):
+        slots = min(slots, MAX_CHUNKS)
+        if slots <= self._slots:
+            return False
+        self._masks = aes_ctr_keystream(self._ctr_key, self._salt, slots * 4)
+        for seq_id in range(self._slots, slots):
+            self._table.setdefault(self._mask(seq_id), []).append(seq_id)
+        self._slots = slots
+        return True
+
+    def _mask(self, seq_id):
+        mask = int.from_bytes(self._masks[seq_id * 4:seq_id * 4 + 4], 'big')
+        return (seq_id ^ mask).to_bytes(4, 'big')
+
+    def encrypt(self, seq_id):
+        """Returns the 4-byte encrypted sequence ID."""
+        if seq_id >= MAX_CHUNKS:
+            raise ValueError(f"Too many chunks! At most {MAX_CHUNKS} per message.")
+        if seq_id >= self._slots:
+            self._grow(max(seq_id + 1, 2 * self._slots))
+        return self._mask(seq_id)
+
+    def candidates(self, enc_seq_id, exhaustive=False):
+        """
+        Returns the sequence IDs whose mask matches enc_seq_id (normally one).
+        The keystream is extended until a match is found, or to MAX_CHUNKS
+        when exhaustive is set.
+        """
+        enc_seq_id = bytes(enc_seq_id)
+        if exhaustive:
+            self._grow(MAX_CHUNKS)
+        while enc_seq_id not in self._table and self._grow(2 * self._slots):
+            pass
+        return self._table.get(enc_seq_id, [])
+
+def encrypt_chunk_v2(seq_id, chunk, inner_key, outer_key, salt, keystream, flags=0, suite=SUITE_TRI_HYBRID):
+    """
+    Encrypts a single chunk in the compact format with the given cipher
+    suite (ID or name), using nonces derived from (salt, seq_id).
+    Returns:
+        tuple: (header, body)
+    """
+    return seal_chunk_v2(seq_id, keystream.encrypt(seq_id), chunk, inner_key, outer_key, salt, flags, suite)
+
+def seal_chunk_v2(seq_id, enc_seq_id, chunk, inner_key, outer_key, salt, flags=0, suite=SUITE_TRI_HYBRID):
+    """
+    Same as encrypt_chunk_v2 with the encrypted sequence ID already
+    computed, so it can run in a worker without the keystream.
+    Returns:
+        tuple: (header, body)
+    """
+    suite = get_suite(suite)
+    header = struct.pack(
+        V2_HEADER_FORMAT, V2_MAGIC, WIRE_FORMAT_V2, suite.suite_id, flags, salt, enc_seq_id
+    )
+    body = suite.seal(chunk, inner_key, outer_key, salt, seq_id, header)
+    return header, body
+
+def parse_v2_header(data):
+    """
+    Returns:
+        tuple: (suite, flags, salt, enc_seq_id), or None if data does not
+        start with a complete compact header.
+    """
+    if len(data) < V2_HEADER_LEN or not is_v2_payload(data):
+        return None
+    _, _, suite, flags, salt, enc_seq_id = struct.unpack(V2_HEADER_FORMAT, bytes(data[:V2_HEADER_LEN]))
+    return suite, flags, salt, enc_seq_id
+
+def decrypt_chunk_v2(data, inner_key, outer_key, ctr_key, keystreams, expected_chunks=64):
+    """
+    Verifies and decrypts one compact payload with the suite named in its
+    header.
+    Args:
+        data (bytes): header + body.
+        keystreams (dict): salt -> SeqIdKeystream cache shared by all chunks
+            of the message being reassembled.
+        expected_chunks (int): Initial keystream size when a new salt is seen.
+    Returns:
+        tuple: (seq_id, chunk_bytes, flags). Raises ValueError on tampering.
+    """
+    parsed = parse_v2_header(data)
+    if parsed is None:
+        raise ValueError("TAMPER ALERT: Compact payload header corrupted!")
+    suite, _, salt, enc_seq_id = parsed
+    suite = get_suite(suite)
+
+    keystream = keystreams.get(salt)
+    if keystream is None:
+        keystream = keystreams[salt] = SeqIdKeystream(ctr_key, salt, expected_chunks)
+
+    tried = set()
+    for exhaustive in (False, True):
+        seq_ids = [i for i in keystream.candidates(enc_seq_id, exhaustive) if i not in tried]
+        tried.update(seq_ids)
+        opened = open_chunk_v2(data, inner_key, outer_key, seq_ids)
+        if opened is not None:
+            return opened
+    raise ValueError(f"TAMPER ALERT: {suite.name} authentication failed for compact chunk.")
+
+def open_chunk_v2(data, inner_key, outer_key, seq_ids):
+    """
+    Tries to open one compact payload as each of the given (candidate)
+    sequence IDs, without touching any keystream.
+    Returns:
+        tuple: (seq_id, chunk_bytes, flags), or None if no candidate
+        authenticates.
+    """
+    parsed = parse_v2_header(data)
+    if parsed is None:
+        return None
+    suite, flags, salt, _ = parsed
+    try:
+        suite = get_suite(suite)
+    except ValueError:
+        return None
+    header, body = bytes(data[:V2_HEADER_LEN]), bytes(data[V2_HEADER_LEN:])
+    for seq_id in seq_ids:
+        chunk = suite.open(body, inner_key, outer_key, salt, seq_id, header)
+        if chunk is not None:
+            return seq_id, chunk, flags
+    return None
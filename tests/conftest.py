@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# The repo is not an installed package; make `src`, `helpers` and
+# `app_config` importable from the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def keys():
+    """Fresh (inner, outer, ctr) symmetric keys for one message."""
+    return os.urandom(32), os.urandom(16), os.urandom(16)
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from src.crypto import ascon_cipher, ascon_fast
+
+reference = pytest.importorskip("ascon")
+
+LENGTHS = [0, 1, 7, 8, 9, 15, 16, 17, 31, 64, 100, 1000]
+
+
+def _case(rng, ad_len, pt_len):
+    return rng.randbytes(16), rng.randbytes(16), rng.randbytes(ad_len), rng.randbytes(pt_len)
+
+
+@pytest.mark.parametrize("pt_len", LENGTHS)
+@pytest.mark.parametrize("ad_len", [0, 1, 8, 13, 24])
+def test_matches_reference(ad_len, pt_len):
+    rng = random.Random(ad_len * 10_000 + pt_len)
+    for _ in range(3):
+        key, nonce, ad, pt = _case(rng, ad_len, pt_len)
+        ct = reference.encrypt(key, nonce, ad, pt, "Ascon-128")
+        assert ascon_fast.encrypt(key, nonce, ad, pt, "Ascon-128") == ct
+        assert ascon_fast.decrypt(key, nonce, ad, ct, "Ascon-128") == pt
+
+
+def test_tag_failure_matches_reference():
+    rng = random.Random(1)
+    for pt_len in LENGTHS:
+        key, nonce, ad, pt = _case(rng, 5, pt_len)
+        ct = ascon_fast.encrypt(key, nonce, ad, pt, "Ascon-128")
+        position = rng.randrange(len(ct))    # ciphertext or tag byte
+        tampered = ct[:position] + bytes([ct[position] ^ 0x80]) + ct[position + 1:]
+        for args in [
+            (key, nonce, ad, tampered),
+            (key, nonce, ad + b"x", ct),
+            (key, bytes(16), ad, ct),
+            (bytes(16), nonce, ad, ct),
+        ]:
+            assert reference.decrypt(*args, "Ascon-128") is None
+            assert ascon_fast.decrypt(*args, "Ascon-128") is None
+
+
+def test_optimized_backend_is_selected():
+    assert ascon_cipher.ASCON_BACKEND == "optimized"
+
+
+def test_backend_override(monkeypatch):
+    monkeypatch.setenv(ascon_cipher.BACKEND_ENV, "reference")
+    assert ascon_cipher._select_backend()[0] == "reference"
+    monkeypatch.setenv(ascon_cipher.BACKEND_ENV, "no-such-backend")
+    with pytest.raises(ImportError):
+        ascon_cipher._select_backend()
+
+
+def test_ciphertext_shorter_than_tag_is_rejected():
+    assert ascon_fast.decrypt(bytes(16), bytes(16), b"", b"short", "Ascon-128") is None
@@ -0,0 +1,65 @@
+import io
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.stego.batch_engine import embed_as_completed, embed_batch, extract_as_completed
+from src.stego.lsb_engine import cover_capacity
+
+
+def _covers(count, side=32):
+    rng = np.random.default_rng(count)
+    covers = []
+    for _ in range(count):
+        buf = io.BytesIO()
+        Image.fromarray(rng.integers(0, 256, (side, side, 3), dtype=np.uint8)).save(buf, format="PNG")
+        covers.append(buf.getvalue())
+    return covers
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_embed_batch_then_extract(max_workers):
+    covers = _covers(4)
+    payloads = [os.urandom(100 + i) for i in range(4)]
+    results = embed_batch(covers, payloads, depth=2, max_workers=max_workers)
+    assert all(error is None for _, error in results)
+
+    extracted = dict(extract_as_completed([png for png, _ in results], max_workers=max_workers))
+    assert [extracted[i] for i in range(4)] == payloads
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_one_failure_does_not_abort_the_batch(max_workers):
+    covers = _covers(3)
+    payloads = [b"fits", bytes(cover_capacity(covers[1]) + 1), b"fits too"]
+    results = embed_batch(covers, payloads, max_workers=max_workers)
+    assert [error is None for _, error in results] == [True, False, True]
+    assert "too small" in results[1][1]
+
+
+def test_embed_batch_needs_one_payload_per_cover():
+    with pytest.raises(ValueError):
+        embed_batch(_covers(2), [b"only one"])
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_embed_as_completed_streams_jobs(max_workers):
+    covers = _covers(5)
+    payloads = [os.urandom(50) for _ in covers]
+    pulled = []
+
+    def jobs():
+        for cover, payload in zip(covers, payloads):
+            pulled.append(payload)
+            yield io.BytesIO(cover), payload
+
+    results = {index: (png, error) for index, png, error in embed_as_completed(jobs(), max_workers=max_workers, window=2)}
+    assert len(pulled) == 5 and all(error is None for _, error in results.values())
+    extracted = dict(extract_as_completed([results[i][0] for i in range(5)], max_workers=max_workers))
+    assert [extracted[i] for i in range(5)] == payloads
+
+
+def test_extract_reports_non_stego_images():
+    assert dict(extract_as_completed([b"not an image"], max_workers=1)) == {0: None}
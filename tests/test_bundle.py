@@ -0,0 +1,85 @@
+import struct
+
+import pytest
+
+from src.utils.bundle import (
+    KEYS_MEMBER, TRAILER_FORMAT, TRAILER_LEN, TRAILER_MAGIC,
+    BundleReader, BundleWriter, stego_member, write_bundle,
+)
+
+IMAGES = [b"png-%d" % i * (i + 1) for i in range(12)]
+KEY_BLOB = b"\x01" * 64
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    return write_bundle(tmp_path / "message.sgb", IMAGES, KEY_BLOB)
+
+
+def test_round_trip(bundle):
+    with BundleReader(bundle) as reader:
+        assert reader.names() == [stego_member(i) for i in range(len(IMAGES))] + [KEYS_MEMBER]
+        assert reader.stego_names() == [stego_member(i) for i in range(len(IMAGES))]
+        assert [reader.read(name) for name in reader.stego_names()] == IMAGES
+        assert reader.read(KEYS_MEMBER) == KEY_BLOB
+        assert reader.size(KEYS_MEMBER) == len(KEY_BLOB)
+
+
+def test_empty_bundle(tmp_path):
+    with BundleWriter(tmp_path / "empty.sgb"):
+        pass
+    with BundleReader(tmp_path / "empty.sgb") as reader:
+        assert reader.names() == []
+
+
+def test_corrupted_member_is_detected(bundle):
+    data = bytearray(bundle.read_bytes())
+    data[5] ^= 0xFF
+    bundle.write_bytes(bytes(data))
+    with BundleReader(bundle) as reader:
+        with pytest.raises(ValueError, match="corrupted"):
+            reader.read(stego_member(0))
+
+
+@pytest.mark.parametrize("cut", [1, TRAILER_LEN, TRAILER_LEN + 1, 100])
+def test_truncated_bundle_is_rejected(bundle, cut):
+    bundle.write_bytes(bundle.read_bytes()[:-cut])
+    with pytest.raises(ValueError):
+        BundleReader(bundle)
+
+
+@pytest.mark.parametrize("cut", [1, 5, 21, 30])
+def test_truncated_offset_table_is_rejected(bundle, cut):
+    # Drop the tail of the offset table but keep a valid trailer
+    data = bundle.read_bytes()
+    table_offset, count, _ = struct.unpack(TRAILER_FORMAT, data[-TRAILER_LEN:])
+    body = data[:-TRAILER_LEN - cut]
+    bundle.write_bytes(body + struct.pack(TRAILER_FORMAT, table_offset, count, TRAILER_MAGIC))
+    with pytest.raises(ValueError):
+        BundleReader(bundle)
+
+
+def test_member_count_beyond_table_is_rejected(bundle):
+    data = bundle.read_bytes()
+    table_offset, count, _ = struct.unpack(TRAILER_FORMAT, data[-TRAILER_LEN:])
+    trailer = struct.pack(TRAILER_FORMAT, table_offset, count + 1, TRAILER_MAGIC)
+    bundle.write_bytes(data[:-TRAILER_LEN] + trailer)
+    with pytest.raises(ValueError, match="truncated"):
+        BundleReader(bundle)
+
+
+def test_duplicate_names(tmp_path, bundle):
+    with BundleWriter(tmp_path / "dup.sgb") as writer:
+        writer.add(KEYS_MEMBER, KEY_BLOB)
+        with pytest.raises(ValueError, match="already has"):
+            writer.add(KEYS_MEMBER, KEY_BLOB)
+
+    # A table listing the same name twice (written by another tool) is rejected too
+    data = bundle.read_bytes()
+    table_offset, count, _ = struct.unpack(TRAILER_FORMAT, data[-TRAILER_LEN:])
+    table = data[table_offset:-TRAILER_LEN]
+    first = table[:2 + len(stego_member(0)) + 20]
+    trailer = struct.pack(TRAILER_FORMAT, table_offset, count + 1, TRAILER_MAGIC)
+    bundle.write_bytes(data[:-TRAILER_LEN] + first + trailer)
+    with pytest.raises(ValueError, match="more than one member"):
+        BundleReader(bundle)
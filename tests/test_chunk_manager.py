@@ -0,0 +1,72 @@
+import pytest
+
+from src.crypto.suites import SUITES
+from src.utils.chunk_manager import (
+    POOL_AUTO, POOL_PROCESS, POOL_THREAD, _map_chunks, _resolve_pool,
+    reassemble_payload_stream, reassemble_payloads, split_and_prepare_payloads,
+)
+from src.utils.wire_format import WIRE_FORMAT_V2
+
+MESSAGE = "Chunk-parallel crypto " * 100
+
+
+def _fail_on(bad):
+    def fn(x):
+        if x == bad:
+            raise ValueError(f"bad job {x}")
+        return x * 2
+    return fn
+
+
+def test_map_chunks_keeps_job_order():
+    assert _map_chunks(_fail_on(None), [(i,) for i in range(20)], max_workers=3) == [i * 2 for i in range(20)]
+
+
+def test_map_chunks_single_job_runs_in_process():
+    def fn():
+        raise RuntimeError("in-process")
+    with pytest.raises(RuntimeError, match="in-process"):
+        _map_chunks(fn, [()], max_workers=4, pool="no such pool")
+
+
+def test_map_chunks_fails_fast():
+    pulled = []
+
+    def jobs():
+        for i in range(1000):
+            pulled.append(i)
+            yield (i,)
+
+    with pytest.raises(ValueError, match="bad job 0"):
+        _map_chunks(_fail_on(0), jobs(), max_workers=2, window=4)
+    assert len(pulled) < 1000
+
+
+def test_auto_pool_by_suite():
+    assert _resolve_pool(POOL_AUTO, "tri-hybrid") == POOL_PROCESS
+    assert _resolve_pool(POOL_AUTO, "chacha20-poly1305") == POOL_THREAD
+    assert _resolve_pool(POOL_THREAD, "tri-hybrid") == POOL_THREAD
+
+
+@pytest.mark.parametrize("suite", sorted(SUITES))
+def test_parallel_auto_round_trip(keys, suite):
+    payloads = split_and_prepare_payloads(
+        MESSAGE, 4, *keys, wire_format=WIRE_FORMAT_V2, suite=suite, max_workers=2, pool=POOL_AUTO,
+    )
+    assert reassemble_payloads(payloads, *keys, max_workers=2, pool=POOL_AUTO) == MESSAGE
+
+
+def test_tampered_chunk_stops_consumption(keys):
+    payloads = split_and_prepare_payloads(MESSAGE, 40, *keys, wire_format=WIRE_FORMAT_V2, suite="chacha20-poly1305")
+    enc_seq_id, content = payloads[0]
+    payloads[0] = (enc_seq_id, content[:-1] + bytes([content[-1] ^ 1]))
+    pulled = []
+
+    def stream():
+        for payload in payloads:
+            pulled.append(payload)
+            yield payload
+
+    with pytest.raises(ValueError, match="TAMPER ALERT"):
+        reassemble_payload_stream(stream(), *keys, max_workers=2, pool=POOL_THREAD)
+    assert len(pulled) < len(payloads)
@@ -0,0 +1,83 @@
+import io
+import lzma
+import os
+
+import pytest
+
+from src.utils.chunk_manager import reassemble_to_stream, split_and_prepare_payloads
+from src.utils.compression import (
+    CODEC_BZ2, CODEC_LZMA, CODEC_ZLIB, LZMA_MIN_DICT, SMALL_INPUT_SIZE,
+    StreamInflater, _COMPRESSORS, _LZMA_FILTERS, _lzma_filters, compress_adaptive, decompress,
+)
+from src.utils.wire_format import WIRE_FORMAT_V2
+
+CODECS = [CODEC_ZLIB, CODEC_LZMA, CODEC_BZ2]
+TEXT = b"the quick brown fox jumps over the lazy dog " * 2000
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_round_trip(codec):
+    assert decompress(codec, _COMPRESSORS[codec](TEXT)) == TEXT
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_output_cap(codec):
+    with pytest.raises(ValueError, match="exceeds"):
+        decompress(codec, _COMPRESSORS[codec](bytes(100_000)), max_size=1000)
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_truncated_stream(codec):
+    payload = _COMPRESSORS[codec](TEXT)
+    with pytest.raises(ValueError, match="Decompression failed"):
+        decompress(codec, payload[:len(payload) // 2])
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_trailing_data(codec):
+    with pytest.raises(ValueError, match="after the end"):
+        decompress(codec, _COMPRESSORS[codec](TEXT) + b"extra")
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_stream_inflater_pieces(codec):
+    payload = _COMPRESSORS[codec](TEXT)
+    inflater = StreamInflater(codec)
+    out = b"".join(piece for i in range(0, len(payload), 7) for piece in inflater.feed(payload[i:i + 7]))
+    inflater.finish()
+    assert out == TEXT
+
+
+def test_compress_adaptive_skips_incompressible():
+    data = os.urandom(4096)
+    assert compress_adaptive(data) == (0, data)
+
+
+def test_small_input_only_tries_zlib(monkeypatch):
+    tried = []
+    for codec, compress in list(_COMPRESSORS.items()):
+        monkeypatch.setitem(_COMPRESSORS, codec, lambda data, c=codec, f=compress: tried.append(c) or f(data))
+    message = b"see you at the meeting tomorrow at 10, bring the slides " * 3
+    assert len(message) < SMALL_INPUT_SIZE
+    assert compress_adaptive(message)[0] == CODEC_ZLIB
+    assert tried == [CODEC_ZLIB]
+
+
+def test_lzma_dictionary_fits_the_input():
+    assert _lzma_filters(200)[0]["dict_size"] == LZMA_MIN_DICT
+    assert _lzma_filters(100_000)[0]["dict_size"] == 1 << 17
+    assert compress_adaptive(TEXT[:SMALL_INPUT_SIZE * 4])[0] in CODECS
+
+
+def test_full_preset_lzma_still_decodes():
+    # Messages sent before the dictionary was sized to the input
+    payload = lzma.compress(TEXT, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+    assert decompress(CODEC_LZMA, payload) == TEXT
+
+
+def test_reassemble_to_stream_inflates(keys):
+    message = TEXT.decode()
+    payloads = split_and_prepare_payloads(message, 3, *keys, wire_format=WIRE_FORMAT_V2, compress=True)
+    sink = io.BytesIO()
+    assert reassemble_to_stream(payloads, sink, *keys) == len(TEXT)
+    assert sink.getvalue() == TEXT
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.stego import cover_catalog
+from src.stego.cover_catalog import CATALOG_INDEX, entry_capacity, scan_covers, select_covers
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    monkeypatch.setattr(cover_catalog, "_indexes", {})
+    for i, side in enumerate([16, 32, 48]):
+        Image.fromarray(np.zeros((side, side, 3), dtype=np.uint8)).save(tmp_path / f"cover_{i}.png")
+    (tmp_path / "notes.png").write_bytes(b"not an image")
+    return tmp_path
+
+
+def test_scan_writes_index_and_skips_unreadable(library):
+    entries = scan_covers(library)
+    assert sorted(e["width"] for e in entries) == [16, 32, 48]
+    assert (library / CATALOG_INDEX).exists()
+    assert not list(library.glob("*.tmp"))
+
+
+def test_unchanged_covers_are_not_probed_again(library, monkeypatch):
+    scan_covers(library)
+    monkeypatch.setattr(cover_catalog, "_indexes", {})    # re-read from the saved index
+    monkeypatch.setattr(cover_catalog, "cover_geometry", pytest.fail)
+    assert len(scan_covers(library)) == 3
+
+
+def test_loaded_index_is_kept_in_memory(library, monkeypatch):
+    scan_covers(library)
+    monkeypatch.setattr(cover_catalog, "_indexes", {})
+    scan_covers(library)    # loads the saved index
+    monkeypatch.setattr(cover_catalog.json, "load", pytest.fail)
+    assert len(scan_covers(library)) == 3
+
+
+def test_unwritable_library_still_scans(library, monkeypatch, capsys):
+    def read_only(*args, **kwargs):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(cover_catalog.tempfile, "mkstemp", read_only)
+    assert len(scan_covers(library)) == 3
+    assert "Cover index not saved" in capsys.readouterr().out
+    monkeypatch.setattr(cover_catalog, "cover_geometry", pytest.fail)
+    assert len(scan_covers(library)) == 3    # kept in memory, not probed again
+
+
+def test_select_fewest_covers(library):
+    entries = scan_covers(library)
+    largest = max(entry_capacity(e) for e in entries)
+    assert len(select_covers(entries, largest - 40, overhead=33)) == 1
+    assert len(select_covers(entries, largest, overhead=33)) == 2
+    with pytest.raises(ValueError, match="too small"):
+        select_covers(entries, sum(entry_capacity(e) for e in entries), overhead=33)
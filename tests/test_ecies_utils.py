@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from helpers.ecies_utils import generate_x25519_keypair, x25519_decrypt_sym_keys, x25519_encrypt_sym_keys
+
+
+def test_round_trip(keys):
+    priv_key, pem = generate_x25519_keypair()
+    blob = x25519_encrypt_sym_keys(*keys, pem, associated_data=b"hdr")
+    assert len(blob) == 112
+    assert x25519_decrypt_sym_keys(blob, priv_key, associated_data=b"hdr") == keys
+
+
+def test_every_blob_uses_a_fresh_ephemeral_key(keys):
+    _, pem = generate_x25519_keypair()
+    assert x25519_encrypt_sym_keys(*keys, pem) != x25519_encrypt_sym_keys(*keys, pem)
+
+
+def test_wrong_key_tampering_and_length_are_rejected(keys):
+    priv_key, pem = generate_x25519_keypair()
+    other, _ = generate_x25519_keypair()
+    blob = x25519_encrypt_sym_keys(*keys, pem, associated_data=b"hdr")
+    tampered = blob[:40] + bytes([blob[40] ^ 1]) + blob[41:]
+    for args in [(blob, other, b"hdr"), (tampered, priv_key, b"hdr"), (blob, priv_key, b"other")]:
+        with pytest.raises(ValueError):
+            x25519_decrypt_sym_keys(*args)
+    with pytest.raises(ValueError, match="wrong length"):
+        x25519_decrypt_sym_keys(blob + os.urandom(1), priv_key, b"hdr")
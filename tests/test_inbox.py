@@ -0,0 +1,54 @@
+import pytest
+
+st = pytest.importorskip("streamlit")
+
+
+@pytest.fixture
+def inbox(tmp_path, monkeypatch):
+    """helpers.inbox with INBOX_DIR in tmp_path."""
+    monkeypatch.setenv("STEGO_STAGING_DIR", str(tmp_path / "staging"))
+    monkeypatch.setattr(st, "secrets", {"users": {"user1": "test111", "user2": "test222"}}, raising=False)
+    from helpers import inbox
+
+    monkeypatch.setattr(inbox, "INBOX_DIR", tmp_path / "inbox")
+    monkeypatch.setattr(inbox, "_migrated", set())
+    (tmp_path / "inbox" / "user2").mkdir(parents=True)
+    return inbox
+
+
+def test_deliver_open_clear(inbox, tmp_path):
+    stego = [tmp_path / f"s{i}.png" for i in range(2)]
+    for i, path in enumerate(stego):
+        path.write_bytes(b"png %d" % i)
+    first  = inbox.deliver_message("user2", "user1", stego, b"keys-1")
+    second = inbox.deliver_message("user2", "user1", stego[:1], b"keys-2")
+
+    assert [m["id"] for m in inbox.list_messages("user2")] == [first, second]
+    assert inbox.message_manifest("user2", first)["images"] == 2
+    with inbox.open_message("user2", first) as reader:
+        assert reader.stego_names() == ["stego_0.png", "stego_1.png"]
+        assert reader.read("keys.bin") == b"keys-1"
+
+    inbox.clear_message("user2", first)
+    assert [m["id"] for m in inbox.list_messages("user2")] == [second]
+    assert len(list((inbox.INBOX_DIR / "user2").glob("*.sgb"))) == 1
+    with pytest.raises(KeyError):
+        inbox.open_message("user2", first)
+
+
+def test_pre_queue_message_is_migrated_once(inbox, monkeypatch):
+    root = inbox.INBOX_DIR / "user2"
+    for i in (0, 1, 10):
+        (root / f"stego_{i}.png").write_bytes(b"png %d" % i)
+    (root / "keys.bin").write_bytes(b"old keys")
+
+    [manifest] = inbox.list_messages("user2")
+    assert manifest["sender"] is None
+    with inbox.open_message("user2", manifest["id"]) as reader:
+        assert [reader.read(n) for n in reader.stego_names()] == [b"png 0", b"png 1", b"png 10"]
+        assert reader.read("keys.bin") == b"old keys"
+    assert not (root / "keys.bin").exists() and not list(root.glob("stego_*.png"))
+
+    # Checked once per process: the root is not looked at again
+    (root / "keys.bin").write_bytes(b"late")
+    assert len(inbox.list_messages("user2")) == 1
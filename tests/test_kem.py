@@ -0,0 +1,55 @@
+import pytest
+
+st = pytest.importorskip("streamlit")
+
+
+@pytest.fixture(scope="module")
+def kem(tmp_path_factory):
+    """helpers.kem, importable once app_config has a user table."""
+    mp = pytest.MonkeyPatch()
+    mp.setenv("STEGO_STAGING_DIR", str(tmp_path_factory.mktemp("staging")))
+    mp.setattr(st, "secrets", {"users": {"user1": "test111", "user2": "test222"}}, raising=False)
+    from helpers import kem
+    yield kem
+    mp.undo()
+
+
+@pytest.fixture(scope="module")
+def rsa_keypair(kem):
+    from helpers.rsa_utils import generate_rsa_keypair
+    return generate_rsa_keypair()    # not from the background pool
+
+
+@pytest.fixture(scope="module")
+def x25519_keypair(kem):
+    return kem.generate_keypair(kem.KEM_X25519)
+
+
+@pytest.mark.parametrize("kem_name", ["rsa-2048", "x25519"])
+def test_round_trip(kem, keys, kem_name, rsa_keypair, x25519_keypair):
+    priv_key, pem = rsa_keypair if kem_name == kem.KEM_RSA else x25519_keypair
+    blob = kem.encapsulate_sym_keys(*keys, pem, kem_name, "user2")
+    assert kem.blob_kem(blob) == kem_name
+    assert kem.private_key_kem(priv_key) == kem_name
+    assert kem.decapsulate_sym_keys(blob, priv_key) == keys
+
+
+def test_legacy_header_less_rsa_blob(kem, keys, rsa_keypair):
+    from helpers.rsa_utils import rsa_encrypt_sym_keys
+
+    priv_key, pem = rsa_keypair
+    blob = rsa_encrypt_sym_keys(*keys, pem)
+    assert len(blob) == kem.LEGACY_RSA_BLOB_LEN
+    assert kem.decapsulate_sym_keys(blob, priv_key) == keys
+
+
+def test_kem_mismatch_and_corruption(kem, keys, rsa_keypair, x25519_keypair):
+    rsa_priv, _ = rsa_keypair
+    x_priv, x_pem = x25519_keypair
+    blob = kem.encapsulate_sym_keys(*keys, x_pem, kem.KEM_X25519)
+    with pytest.raises(ValueError, match="sealed with X25519"):
+        kem.decapsulate_sym_keys(blob, rsa_priv)
+    with pytest.raises(ValueError):
+        kem.decapsulate_sym_keys(blob[:3] + b"\x09" + blob[4:], x_priv)    # unknown KEM ID
+    with pytest.raises(ValueError):
+        kem.decapsulate_sym_keys(blob[:-1] + bytes([blob[-1] ^ 1]), x_priv)
@@ -0,0 +1,60 @@
+import json
+import threading
+
+import pytest
+
+st = pytest.importorskip("streamlit")
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """key_registry on a fresh database in tmp_path, with a legacy JSON registry."""
+    monkeypatch.setenv("STEGO_STAGING_DIR", str(tmp_path / "staging"))
+    monkeypatch.setattr(st, "secrets", {"users": {"user1": "test111", "user2": "test222"}}, raising=False)
+    from helpers import key_registry
+
+    legacy = tmp_path / "public_keys.json"
+    legacy.write_text(json.dumps({"user1": "OLD-PEM", "user2": {"kem": "x25519", "pem": "X-PEM"}}))
+    monkeypatch.setattr(key_registry, "PUBLIC_KEYS_DB", tmp_path / "public_keys.db")
+    monkeypatch.setattr(key_registry, "PUBLIC_KEYS_FILE", legacy)
+    monkeypatch.setattr(key_registry, "_local", threading.local())
+    monkeypatch.setattr(key_registry, "_setup_done", set())
+    return key_registry
+
+
+def _in_thread(fn):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_legacy_json_is_imported_once(registry, monkeypatch):
+    assert registry.get_key("user1") == {"kem": "rsa-2048", "pem": "OLD-PEM", "version": 1}
+    assert registry.get_key("user2")["kem"] == "x25519"
+    registry.PUBLIC_KEYS_FILE.write_text(json.dumps({"user1": "AGAIN"}))
+    monkeypatch.setattr(registry, "_local", threading.local())
+    registry._setup_done.clear()    # as in a new process
+    assert registry.get_key("user1")["pem"] == "OLD-PEM"
+
+
+def test_versions_and_generation(registry):
+    generation = registry.registry_generation()
+    assert registry.publish_key("user1", "x25519", "NEW-PEM") == 2
+    assert registry.registry_generation() == generation + 1
+    assert registry.get_key("user1") == {"kem": "x25519", "pem": "NEW-PEM", "version": 2}
+    assert [k["version"] for k in registry.key_history("user1")] == [1, 2]
+    assert registry.keys_snapshot() == (generation + 1, registry.all_keys())
+
+
+def test_setup_runs_once_per_process(registry, monkeypatch):
+    registry.get_key("user1")
+
+    def fail(conn):
+        raise AssertionError("setup ran again")
+
+    monkeypatch.setattr(registry, "_migrate_json", fail)
+    # A new thread (as in a Streamlit rerun) only opens its own connection
+    assert _in_thread(lambda: registry.get_key("user1"))["pem"] == "OLD-PEM"
+    assert _in_thread(lambda: registry.publish_key("user2", "rsa-2048", "PEM")) == 2
@@ -0,0 +1,121 @@
+import io
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.stego.lsb_engine import (
+    HEADER_LEN, LEGACY_LENGTH_BITS, MODE_CHANNELS, MODE_CODES, SUPPORTED_DEPTHS,
+    build_header, cover_capacity, embed, extract, parse_header,
+)
+
+
+def _png(pixels):
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _legacy_stego(payload, shape=(32, 32, 3)):
+    """An image in the length-only format written before the stego header."""
+    pixels = np.random.default_rng(3).integers(0, 256, shape, dtype=np.uint8)
+    bits = np.unpackbits(np.frombuffer(len(payload).to_bytes(4, "big") + payload, dtype=np.uint8))
+    flat = pixels.reshape(-1)
+    flat[:bits.size] = (flat[:bits.size] & 0xFE) | bits
+    return _png(pixels)
+
+
+def test_legacy_format_is_still_read():
+    payload = bytes(range(200))
+    for engine in ("numpy", "loop"):
+        assert extract(_legacy_stego(payload), engine=engine) == payload
+    assert extract(_legacy_stego(payload), legacy=False) is None
+
+
+def test_legacy_length_beyond_capacity_is_rejected():
+    pixels = np.zeros((8, 8, 3), dtype=np.uint8)
+    pixels.reshape(-1)[:LEGACY_LENGTH_BITS] = 1    # length 0xFFFFFFFF
+    assert extract(_png(pixels)) is None
+    assert extract(_png(np.zeros((8, 8, 3), dtype=np.uint8))) is None    # length 0
+
+
+def _cover(mode, side=40):
+    rng = np.random.default_rng(len(mode) + side)
+    if mode == "I;16":
+        return rng.integers(0, 1 << 16, (side, side), dtype=np.uint16)
+    channels = MODE_CHANNELS[mode]
+    shape = (side, side) if channels == 1 else (side, side, channels)
+    return rng.integers(0, 256, shape, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("engine", ["numpy", "loop"])
+@pytest.mark.parametrize("depth", SUPPORTED_DEPTHS)
+@pytest.mark.parametrize("mode", sorted(MODE_CODES))
+def test_round_trip(mode, depth, engine):
+    pixels = _cover(mode)
+    payload = os.urandom(cover_capacity(pixels, depth))    # fill the cover exactly
+    stego = embed(pixels, payload, engine=engine, depth=depth)
+    assert stego is not None
+    with Image.open(io.BytesIO(stego)) as image:
+        assert image.size == (40, 40)
+    assert extract(stego, engine=engine) == payload
+    assert cover_capacity(stego, depth) == len(payload)
+
+
+def test_engines_produce_identical_images():
+    pixels, payload = _cover("RGB"), os.urandom(300)
+    for depth in SUPPORTED_DEPTHS:
+        assert embed(pixels, payload, "numpy", depth) == embed(pixels, payload, "loop", depth)
+
+
+def test_cover_sources(tmp_path):
+    pixels = _cover("RGBA")
+    png = _png(pixels)
+    path = tmp_path / "cover.png"
+    path.write_bytes(png)
+    payload = b"hidden in many forms"
+    with open(path, "rb") as f:
+        sources = [str(path), path, png, io.BytesIO(png), f, Image.open(io.BytesIO(png)), pixels]
+        for source in sources:
+            assert extract(embed(source, payload)) == payload
+
+
+def test_non_contiguous_array_cover():
+    pixels = np.asfortranarray(_cover("RGB"))
+    transposed = _cover("RGB").transpose(1, 0, 2)
+    for cover in (pixels, transposed):
+        stego = embed(cover, b"strided")
+        assert extract(stego) == b"strided"
+        decoded = np.asarray(Image.open(io.BytesIO(stego)))
+        assert np.array_equal(decoded >> 1, np.ascontiguousarray(cover) >> 1)    # only LSBs changed
+
+
+def test_palette_cover_is_converted():
+    image = Image.fromarray(_cover("RGB")).convert("P")
+    assert extract(embed(image, b"palette")) == b"palette"
+
+
+def test_payload_beyond_capacity_is_refused():
+    pixels = _cover("L", side=16)
+    assert embed(pixels, bytes(cover_capacity(pixels) + 1)) is None
+    with pytest.raises(ValueError):
+        embed(pixels, b"x", depth=5)
+
+
+def test_damaged_header_is_rejected():
+    stego = np.asarray(Image.open(io.BytesIO(embed(_cover("RGBA"), b"payload")))).copy()
+    stego.reshape(-1)[3] ^= 1    # one header bit
+    assert extract(_png(stego), legacy=False) is None
+
+
+def test_re_encoded_mode_is_rejected():
+    stego = Image.open(io.BytesIO(embed(_cover("RGB"), b"payload")))
+    assert extract(stego.convert("RGBA")) is None
+
+
+def test_header_fields():
+    header = build_header(1234, flags=3)
+    assert len(header) == HEADER_LEN
+    assert parse_header(header) == (3, 1234)
+    assert parse_header(header[:-1] + bytes([header[-1] ^ 1])) is None
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+st = pytest.importorskip("streamlit")
+
+
+@pytest.fixture
+def staging(tmp_path, monkeypatch):
+    """helpers.staging with STAGING_DIR in tmp_path."""
+    monkeypatch.setenv("STEGO_STAGING_DIR", str(tmp_path / "staging"))
+    monkeypatch.setattr(st, "secrets", {"users": {"user1": "test111", "user2": "test222"}}, raising=False)
+    from helpers import staging
+
+    monkeypatch.setattr(staging, "STAGING_DIR", tmp_path / "staging")
+    return staging
+
+
+def test_job_lifecycle(staging):
+    job = staging.new_job()
+    assert job.parent == staging.STAGING_DIR and job.name.startswith(staging.JOB_PREFIX)
+    (job / "stego_0.png").write_bytes(b"png")
+    staging.release_job(job)
+    staging.release_job(job)
+    staging.release_job(None)
+    assert not job.exists()
+
+
+def test_release_ignores_paths_outside_staging(staging, tmp_path):
+    outside = tmp_path / "keep"
+    outside.mkdir()
+    staging.release_job(outside)
+    assert outside.exists()
+
+
+def test_sweep_only_removes_stale_workspaces(staging):
+    root = staging.STAGING_DIR
+    root.mkdir()
+    for name in ["job-old", "tmpold", "job-new", "shared", "job-file"]:
+        path = root / name
+        path.write_bytes(b"x") if name == "job-file" else path.mkdir()
+        if name != "job-new":
+            os.utime(path, (0, 0))
+    (root / "job-link").symlink_to(root / "shared")
+    os.utime(root / "job-link", (0, 0), follow_symlinks=False)
+
+    assert staging.sweep_stale(ttl=60) == 2
+    assert sorted(p.name for p in root.iterdir()) == ["job-file", "job-link", "job-new", "shared"]
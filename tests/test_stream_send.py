@@ -0,0 +1,131 @@
+import contextlib
+import io
+import os
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+st = pytest.importorskip("streamlit")
+
+from src.stego.lsb_engine import extract
+from src.utils.chunk_manager import reassemble_to_stream
+
+USERS = {"user1": "test111", "user2": "test222"}
+COVER_SIDE = 64    # RGB: ~1.5 KB of payload per cover at depth 1
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    """
+    Imports the helpers (app_config reads the user table from st.secrets)
+    and points the inbox and key registry at tmp_path.
+    """
+    monkeypatch.setenv("STEGO_STAGING_DIR", str(tmp_path / "staging"))
+    monkeypatch.setattr(st, "secrets", {"users": USERS}, raising=False)
+    from helpers import inbox, key_registry, rsa_utils, stream_send
+    from helpers.kem import generate_keypair
+
+    monkeypatch.setattr(inbox, "INBOX_DIR", tmp_path / "inbox")
+    monkeypatch.setattr(key_registry, "PUBLIC_KEYS_DB", tmp_path / "public_keys.db")
+    monkeypatch.setattr(key_registry, "PUBLIC_KEYS_FILE", tmp_path / "public_keys.json")
+    monkeypatch.setattr(key_registry, "_local", threading.local())
+    monkeypatch.setattr(rsa_utils, "_registry_cache", None)
+    for user in USERS:
+        (tmp_path / "inbox" / user).mkdir(parents=True)
+
+    priv_key, pem = generate_keypair("x25519")
+    rsa_utils.save_public_key("user2", pem, "x25519")
+    return inbox, stream_send.stream_send, priv_key
+
+
+@pytest.fixture
+def covers(tmp_path):
+    rng, paths = np.random.default_rng(7), []
+    for i in range(4):
+        path = tmp_path / f"cover_{i}.png"
+        Image.fromarray(rng.integers(0, 256, (COVER_SIDE, COVER_SIDE, 3), dtype=np.uint8)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def _receive(inbox, priv_key, msg_id):
+    from helpers.kem import decapsulate_sym_keys
+
+    with inbox.open_message("user2", msg_id) as reader:
+        keys = decapsulate_sym_keys(reader.read("keys.bin"), priv_key)
+        raws = [extract(reader.read(name)) for name in reader.stego_names()]
+    sink = io.BytesIO()
+    reassemble_to_stream(((raw[:12], raw[12:]) for raw in raws), sink, *keys, expected_chunks=len(raws))
+    return sink.getvalue()
+
+
+def _assert_nothing_delivered(inbox):
+    user_dir = inbox.INBOX_DIR / "user2"
+    assert inbox.list_messages("user2") == []
+    assert not list(user_dir.glob("*.sgb"))
+    assert not list((user_dir / inbox.INCOMING_DIR).glob("*"))
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+@pytest.mark.parametrize("as_files", [False, True])
+def test_stream_send_round_trip(env, covers, max_workers, as_files):
+    inbox, stream_send, priv_key = env
+    data = os.urandom(3000)    # incompressible: needs several covers
+    with contextlib.ExitStack() as stack:
+        if as_files:
+            covers = [stack.enter_context(open(path, "rb")) for path in covers]
+        msg_id = stream_send("user2", "user1", data, covers=covers, max_workers=max_workers)
+
+    [manifest] = inbox.list_messages("user2")
+    assert manifest["id"] == msg_id and manifest["sender"] == "user1"
+    assert 2 <= manifest["images"] <= len(covers)
+    assert _receive(inbox, priv_key, msg_id) == data
+
+
+def test_overflow_of_unsized_source(env, covers):
+    inbox, stream_send, _ = env
+    pieces = iter([os.urandom(4096)] * 4)    # 16 KB, length unknown up front
+    with pytest.raises(ValueError, match="does not fit"):
+        stream_send("user2", "user1", pieces, covers=covers, max_workers=1)
+    _assert_nothing_delivered(inbox)
+
+
+def test_overflow_of_sized_source(env, covers):
+    inbox, stream_send, _ = env
+    with pytest.raises(ValueError, match="does not fit"):
+        stream_send("user2", "user1", os.urandom(16384), covers=covers, max_workers=1)
+    _assert_nothing_delivered(inbox)
+
+
+def test_failed_embed_delivers_nothing(env, covers, monkeypatch):
+    inbox, stream_send, _ = env
+    from src.stego import batch_engine
+
+    embed_job, calls = batch_engine._embed_job, []
+
+    def fail_second(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise OSError("cover unreadable")
+        return embed_job(*args)
+
+    monkeypatch.setattr(batch_engine, "_embed_job", fail_second)
+    with pytest.raises(ValueError, match="Stego embedding failed"):
+        stream_send("user2", "user1", os.urandom(3000), covers=covers, max_workers=1)
+    assert len(calls) == 2    # the first chunk was already in the bundle
+    _assert_nothing_delivered(inbox)
+
+
+def test_failed_index_write_delivers_nothing(env, covers, monkeypatch):
+    inbox, stream_send, _ = env
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(inbox, "_write_index", fail)
+        with pytest.raises(OSError, match="disk full"):
+            stream_send("user2", "user1", os.urandom(3000), covers=covers, max_workers=1)
+    _assert_nothing_delivered(inbox)
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from src.crypto import aes_cipher
+from src.crypto.suites import SUITES
+from src.utils.chunk_manager import (
+    encrypt_chunk, iter_prepare_payloads, reassemble_payloads, split_and_prepare_payloads,
+)
+from src.utils.wire_format import (
+    FLAG_FINAL, FLAG_TEXT, V2_HEADER_LEN, V2_MAGIC, WIRE_FORMAT_V2,
+    SeqIdKeystream, decrypt_chunk_v2, encrypt_chunk_v2, is_v2_payload, new_salt, parse_v2_header,
+)
+
+MESSAGE = "Compact wire format — round trip ✓ " * 40
+
+
+@pytest.mark.parametrize("suite", sorted(SUITES))
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip(keys, suite, compress):
+    payloads = split_and_prepare_payloads(
+        MESSAGE, 5, *keys, wire_format=WIRE_FORMAT_V2, compress=compress, suite=suite,
+    )
+    assert all(is_v2_payload(enc_seq_id) for enc_seq_id, _ in payloads)
+    assert reassemble_payloads(payloads, *keys) == MESSAGE
+
+
+def test_parallel_round_trip(keys):
+    payloads = split_and_prepare_payloads(MESSAGE, 6, *keys, wire_format=WIRE_FORMAT_V2)
+    assert reassemble_payloads(payloads, *keys, max_workers=2) == MESSAGE
+
+
+def test_header_fields(keys):
+    inner, outer, ctr = keys
+    salt = new_salt()
+    header, _ = encrypt_chunk_v2(3, b"chunk", inner, outer, salt, SeqIdKeystream(ctr, salt), FLAG_TEXT | FLAG_FINAL)
+    assert len(header) == V2_HEADER_LEN
+    suite, flags, parsed_salt, _ = parse_v2_header(header)
+    assert (suite, flags, parsed_salt) == (0, FLAG_TEXT | FLAG_FINAL, salt)
+
+
+def test_single_chunk_decrypt(keys):
+    inner, outer, ctr = keys
+    salt = new_salt()
+    header, body = encrypt_chunk_v2(7, b"seven", inner, outer, salt, SeqIdKeystream(ctr, salt))
+    assert decrypt_chunk_v2(header + body, inner, outer, ctr, {}) == (7, b"seven", 0)
+
+
+@pytest.mark.parametrize("offset", [4, V2_HEADER_LEN - 1, V2_HEADER_LEN, -1])
+def test_tampered_byte_is_rejected(keys, offset):
+    payloads = split_and_prepare_payloads(MESSAGE, 3, *keys, wire_format=WIRE_FORMAT_V2)
+    enc_seq_id, content = payloads[0]
+    data = bytearray(enc_seq_id + content)
+    data[offset] ^= 0x01
+    split = len(enc_seq_id)
+    payloads[0] = (bytes(data[:split]), bytes(data[split:]))
+    with pytest.raises(ValueError, match="TAMPER ALERT"):
+        reassemble_payloads(payloads, *keys)
+
+
+def test_chunk_from_another_message_is_rejected(keys):
+    first = split_and_prepare_payloads(MESSAGE, 3, *keys, wire_format=WIRE_FORMAT_V2)
+    second = split_and_prepare_payloads(MESSAGE, 3, *keys, wire_format=WIRE_FORMAT_V2)
+    with pytest.raises(ValueError, match="TAMPER ALERT"):
+        reassemble_payloads(first[:2] + second[:1], *keys)
+
+
+def test_missing_final_chunk_is_detected(keys):
+    payloads = list(iter_prepare_payloads(os.urandom(1000), 250, *keys, wire_format=WIRE_FORMAT_V2))
+    with pytest.raises(ValueError, match="final chunk"):
+        reassemble_payloads(payloads[:-1], *keys)
+
+
+def test_v1_payload_with_v2_magic_falls_back(keys, monkeypatch):
+    inner, outer, ctr = keys
+
+    class _Urandom:
+        @staticmethod
+        def urandom(n):
+            # Force the (random) AES-CTR nonce to begin with the v2 magic
+            return (V2_MAGIC + bytes([WIRE_FORMAT_V2]) + os.urandom(n))[:n] if n == 8 else os.urandom(n)
+
+    monkeypatch.setattr(aes_cipher, "os", _Urandom)
+    lookalike = encrypt_chunk(0, "looks compact", inner, outer, ctr)
+    monkeypatch.undo()
+    assert is_v2_payload(lookalike[0])
+
+    rest = encrypt_chunk(1, " but is v1", inner, outer, ctr)
+    assert reassemble_payloads([rest, lookalike], *keys) == "looks compact but is v1"
+    assert reassemble_payloads([rest, lookalike], *keys, max_workers=2) == "looks compact but is v1"
@@ -1,6 +1,9 @@
 import streamlit as st
 
-from helpers.rsa_utils import load_public_keys, generate_rsa_keypair, save_public_key
+from app_config        import DEFAULT_KEM, RSA_POOL_SIZE
+from helpers.rsa_utils import load_public_keys, save_public_key
+from helpers.kem       import KEM_LABELS, KEM_RSA, generate_keypair
+from helpers.keypool   import get_key_pool
 
 
 def panel_key_status(user: str, partner: str) -> None:
@@ -13,18 +16,18 @@ def panel_key_status(user: str, partner: str) -> None:
 
     if keys_gen:
         st.markdown(
-            '<div class="sc-key-row">'
-            '<span class="sc-dot-ok">●</span>'
-            '<span class="sc-key-label">Your RSA-2048</span>'
-            '<span class="sc-key-status-ok">ACTIVE</span>'
-            '</div>',
+            f'<div class="sc-key-row">'
+            f'<span class="sc-dot-ok">●</span>'
+            f'<span class="sc-key-label">Your {KEM_LABELS[st.session_state.kem]}</span>'
+            f'<span class="sc-key-status-ok">ACTIVE</span>'
+            f'</div>',
             unsafe_allow_html=True,
         )
     else:
         st.markdown(
             '<div class="sc-key-row">'
             '<span class="sc-dot-err">●</span>'
-            '<span class="sc-key-label">Your RSA-2048</span>'
+            '<span class="sc-key-label">Your keypair</span>'
             '<span class="sc-key-status-err">NONE</span>'
             '</div>',
             unsafe_allow_html=True,
@@ -34,7 +37,7 @@ def panel_key_status(user: str, partner: str) -> None:
         st.markdown(
             f'<div class="sc-key-row">'
             f'<span class="sc-dot-ok">●</span>'
-            f'<span class="sc-key-label">{partner.capitalize()} pubkey</span>'
+            f'<span class="sc-key-label">{partner.capitalize()} {KEM_LABELS[public_keys[partner]["kem"]]}</span>'
             f'<span class="sc-key-status-ok">READY</span>'
             f'</div>',
             unsafe_allow_html=True,
@@ -52,12 +55,23 @@ def panel_key_status(user: str, partner: str) -> None:
     st.markdown('<hr class="sc-divider">', unsafe_allow_html=True)
 
     if not keys_gen:
-        if st.button("⚡ GENERATE RSA KEYS", width="stretch", key="btn_gen_keys"):
-            with st.spinner("Generating RSA-2048 keypair…"):
-                priv, pub_pem = generate_rsa_keypair()
+        kem = st.radio(
+            "Key encapsulation",
+            options=list(KEM_LABELS),
+            index=list(KEM_LABELS).index(DEFAULT_KEM),
+            format_func=KEM_LABELS.get,
+            horizontal=True,
+            key="sel_kem",
+        )
+        if kem == KEM_RSA and RSA_POOL_SIZE > 0:
+            get_key_pool()   # start pre-generating while the user decides
+        if st.button("⚡ GENERATE KEYS", width="stretch", key="btn_gen_keys"):
+            with st.spinner(f"Generating {KEM_LABELS[kem]} keypair…"):
+                priv, pub_pem = generate_keypair(kem)
                 st.session_state.private_key    = priv
+                st.session_state.kem            = kem
                 st.session_state.keys_generated = True
-                save_public_key(user, pub_pem)
+                save_public_key(user, pub_pem, kem)
             st.success("Keys generated & published.")
             st.rerun()
     else:
@@ -86,7 +100,7 @@ def panel_key_status(user: str, partner: str) -> None:
           <span style="color:#a855f7;">↓</span><br>
           <span style="color:#00ffa3;">★</span> LSB Stego<br>
           <span style="color:#00ffa3;">↓</span><br>
-          <span style="color:#f59e0b;">⬡</span> RSA-2048 KEM
+          <span style="color:#f59e0b;">⬡</span> RSA-2048 / X25519 KEM
         </div>
         """,
         unsafe_allow_html=True,
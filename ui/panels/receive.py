@@ -1,12 +1,14 @@
-from pathlib import Path
+import time
 
 import streamlit as st
 
-from app_config import INBOX_DIR, ENC_SEQ_ID_LEN
-from helpers.inbox    import inbox_has_message, clear_inbox
-from helpers.rsa_utils import rsa_decrypt_sym_keys
-from src.utils.chunk_manager import reassemble_payloads
-from src.stego.lsb_engine    import extract_data
+from app_config import ENC_SEQ_ID_LEN, STEGO_WORKERS, CRYPTO_WORKERS, CRYPTO_POOL
+from helpers.inbox    import list_messages, message_manifest, open_message, clear_message
+from helpers.kem      import decapsulate_sym_keys
+from src.utils.chunk_manager import reassemble_payload_stream
+from src.stego.batch_engine  import extract_as_completed
+from src.utils.bundle        import KEYS_MEMBER
+from src.utils.wire_format   import payload_suite
 
 def panel_receive(user: str, partner: str) -> None:
     stage = st.session_state.recv_stage
@@ -24,21 +26,29 @@ def panel_receive(user: str, partner: str) -> None:
         st.markdown('</div>', unsafe_allow_html=True)
         return
 
-    if inbox_has_message(user):
+    messages = list_messages(user)
+    if messages:
         st.markdown(
             f'<div class="sc-alert sc-alert-warn">'
-            f'📨 New encrypted message from <b>{partner}</b>.</div>',
+            f'📨 <b>{len(messages)}</b> encrypted message(s) waiting.</div>',
             unsafe_allow_html=True,
         )
-        if st.button("📬 CHECK INBOX", width="stretch", key="btn_check_inbox"):
-            if not st.session_state.keys_generated:
-                st.markdown(
-                    '<div class="sc-alert sc-alert-err">⚠ You need your RSA keys to decrypt. Generate them first.</div>',
-                    unsafe_allow_html=True,
-                )
-            else:
-                st.session_state.recv_stage = "inbox_view"
-                st.rerun()
+        for manifest in messages:
+            sent_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(manifest["timestamp"]))
+            label   = (
+                f"📬 {manifest['sender'] or partner} · {sent_at} · "
+                f"{manifest['images']} image(s)"
+            )
+            if st.button(label, width="stretch", key=f"btn_open_{manifest['id']}"):
+                if not st.session_state.keys_generated:
+                    st.markdown(
+                        '<div class="sc-alert sc-alert-err">⚠ You need your keys to decrypt. Generate them first.</div>',
+                        unsafe_allow_html=True,
+                    )
+                else:
+                    st.session_state.recv_msg_id = manifest["id"]
+                    st.session_state.recv_stage  = "inbox_view"
+                    st.rerun()
     else:
         st.markdown(
             '<div class="sc-alert sc-alert-info">No messages in inbox.</div>',
@@ -50,25 +60,30 @@ def panel_receive(user: str, partner: str) -> None:
     st.markdown('</div>', unsafe_allow_html=True)
 
 def _recv_inbox_view(user: str) -> None:
-    """Show received stego-images and wait for the REVEAL button press."""
-    inbox       = INBOX_DIR / user
-    stego_files = sorted(inbox.glob("stego_*.png"))
+    """Show the selected message's stego-images and wait for the REVEAL button press."""
+    with open_message(user, st.session_state.recv_msg_id) as bundle:
+        names    = bundle.stego_names()
+        images   = [bundle.read(name) for name in names]
+        key_blob = bundle.read(KEYS_MEMBER)
+    # Sender-declared, display only; the payload headers name the real suite
+    suite = message_manifest(user, st.session_state.recv_msg_id).get("suite")
+    steps = f"{suite} verify & decrypt" if suite else "authenticated decryption of each chunk"
 
     st.markdown(
         f'<div class="sc-alert sc-alert-info">'
-        f'Received <b>{len(stego_files)}</b> stego-image(s).<br>'
-        f'Press <b>REVEAL</b> to run RSA decapsulation → ASCON verify → ChaCha20 decrypt.</div>',
+        f'Received <b>{len(images)}</b> stego-image(s).<br>'
+        f'Press <b>REVEAL</b> to run KEM decapsulation → {steps}.</div>',
         unsafe_allow_html=True,
     )
 
-    if stego_files:
-        n_cols = min(len(stego_files), 4)
+    if images:
+        n_cols = min(len(images), 4)
         cols   = st.columns(n_cols)
-        for i, f in enumerate(stego_files):
+        for i, (name, png) in enumerate(zip(names, images)):
             with cols[i % n_cols]:
-                st.image(str(f), width="stretch")
+                st.image(png, width="stretch")
                 st.markdown(
-                    f'<div class="sc-img-label">{f.name.upper()}</div>',
+                    f'<div class="sc-img-label">{name.upper()}</div>',
                     unsafe_allow_html=True,
                 )
 
@@ -77,43 +92,52 @@ def _recv_inbox_view(user: str) -> None:
     c1, c2 = st.columns(2)
     with c1:
         if st.button("🔓 REVEAL MESSAGE", width="stretch", key="btn_reveal"):
-            _do_reveal(user, inbox, stego_files)
+            _do_reveal(user, key_blob, names, images)
     with c2:
         if st.button("← BACK", width="stretch", key="btn_recv_back"):
-            st.session_state.recv_stage = None
+            st.session_state.recv_stage  = None
+            st.session_state.recv_msg_id = None
             st.rerun()
 
 
-def _do_reveal(user: str, inbox: Path, stego_files: list) -> None:
+def _do_reveal(user: str, key_blob: bytes, names: list, images: list) -> None:
     """
     Full decryption pipeline:
-      1. RSA-OAEP unwrap → recover inner_key, outer_key, ctr_key
-      2. LSB extract raw bytes from every stego image
-      3. Split raw bytes into enc_seq_id / enc_content
-      4. reassemble_payloads → AES-CTR ID sort → ASCON verify → ChaCha20 decrypt
+      1. KEM unwrap (RSA-OAEP or X25519 ECIES, per keys.bin) → recover
+         inner_key, outer_key, ctr_key
+      2. LSB extract raw bytes from the stego images in a worker pool
+      3. Split raw bytes into enc_seq_id / enc_content as each image completes
+      4. Open each chunk with the cipher suite named in its header, overlapped
+         with the remaining extractions; the first tamper alert aborts the rest
     """
     try:
-        with st.spinner("🔓 RSA decapsulation & tri-hybrid decryption…"):
-            enc_blob = (inbox / "keys.bin").read_bytes()
-            inner_key, outer_key, ctr_key = rsa_decrypt_sym_keys(
-                enc_blob, st.session_state.private_key
+        with st.spinner("🔓 KEM decapsulation & decryption…"):
+            inner_key, outer_key, ctr_key = decapsulate_sym_keys(
+                key_blob, st.session_state.private_key
             )
 
-            recovered_payloads = []
-            for f in stego_files:
-                raw = extract_data(str(f))
-                if raw is None:
-                    raise ValueError(f"LSB extraction returned nothing for {f.name}")
-                enc_seq_id  = raw[:ENC_SEQ_ID_LEN]
-                enc_content = raw[ENC_SEQ_ID_LEN:]
-                recovered_payloads.append((enc_seq_id, enc_content))
-
-            message = reassemble_payloads(
-                recovered_payloads, inner_key, outer_key, ctr_key
+            suites = set()
+
+            def _payloads():
+                for index, raw in extract_as_completed(images, max_workers=STEGO_WORKERS):
+                    if raw is None:
+                        raise ValueError(f"LSB extraction returned nothing for {names[index]}")
+                    try:
+                        suites.add(payload_suite(raw).name)
+                    except ValueError:
+                        pass   # unknown suite ID: decryption raises the tamper alert
+                    yield raw[:ENC_SEQ_ID_LEN], raw[ENC_SEQ_ID_LEN:]
+
+            message = reassemble_payload_stream(
+                _payloads(), inner_key, outer_key, ctr_key,
+                expected_chunks=len(images),
+                max_workers=CRYPTO_WORKERS,
+                pool=CRYPTO_POOL,
             )
 
-        st.session_state.revealed_msg = message
-        st.session_state.recv_stage   = "revealed"
+        st.session_state.revealed_msg   = message
+        st.session_state.revealed_suite = ", ".join(sorted(suites))
+        st.session_state.recv_stage     = "revealed"
         st.rerun()
 
     except Exception as exc:
@@ -124,9 +148,10 @@ def _do_reveal(user: str, inbox: Path, stego_files: list) -> None:
 
 
 def _recv_revealed(user: str) -> None:
-    """Display the decrypted plaintext and offer a CLEAR INBOX action."""
+    """Display the decrypted plaintext and offer to delete the message."""
     st.markdown(
-        '<div class="sc-alert sc-alert-ok">✓ Integrity verified (ASCON-128). Message successfully decrypted.</div>',
+        f'<div class="sc-alert sc-alert-ok">✓ Integrity verified ({st.session_state.revealed_suite}). '
+        f'Message successfully decrypted.</div>',
         unsafe_allow_html=True,
     )
     st.markdown(
@@ -134,8 +159,17 @@ def _recv_revealed(user: str) -> None:
         unsafe_allow_html=True,
     )
     st.markdown('<hr class="sc-divider">', unsafe_allow_html=True)
-    if st.button("🗑 CLEAR INBOX", width="stretch", key="btn_clear_inbox"):
-        clear_inbox(user)
-        st.session_state.recv_stage   = None
-        st.session_state.revealed_msg = None
-        st.rerun()
+    c1, c2 = st.columns(2)
+    with c1:
+        if st.button("🗑 DELETE MESSAGE", width="stretch", key="btn_clear_inbox"):
+            clear_message(user, st.session_state.recv_msg_id)
+            st.session_state.recv_stage   = None
+            st.session_state.recv_msg_id  = None
+            st.session_state.revealed_msg = None
+            st.rerun()
+    with c2:
+        if st.button("← KEEP & BACK", width="stretch", key="btn_keep_msg"):
+            st.session_state.recv_stage   = None
+            st.session_state.recv_msg_id  = None
+            st.session_state.revealed_msg = None
+            st.rerun()
@@ -1,16 +1,32 @@
-import shutil
-import tempfile
-from io       import BytesIO
-from pathlib  import Path
-
 import streamlit as st
-from PIL import Image
 from Crypto.Random import get_random_bytes
 
-from app_config import STAGING_DIR, INBOX_DIR
-from helpers.rsa_utils import load_public_keys, rsa_encrypt_sym_keys
+from app_config import STEGO_WORKERS, CIPHER_SUITE, CRYPTO_WORKERS, CRYPTO_POOL, COVERS_DIR
+from helpers.rsa_utils import load_public_keys
+from helpers.kem       import encapsulate_sym_keys
+from helpers.inbox     import deliver_bundle
+from helpers.staging   import new_job, release_job
 from src.utils.chunk_manager import split_and_prepare_payloads
-from src.stego.lsb_engine    import embed_data
+from src.utils.wire_format   import WIRE_FORMAT_V2, payload_overhead
+from src.crypto.suites       import get_suite
+from src.stego.lsb_engine    import SUPPORTED_DEPTHS, cover_capacity
+from src.stego.batch_engine  import embed_batch
+from src.stego.cover_catalog import entry_capacity, scan_covers, select_covers
+from src.utils.bundle        import BundleReader, write_bundle
+
+
+@st.cache_data(show_spinner=False)
+def _library_size(cover_dir: str, stamp: int) -> int:
+    """Number of usable library covers; stamp (the directory mtime) keys the cache."""
+    return len(scan_covers(cover_dir))
+
+
+def _library_stamp() -> int | None:
+    try:
+        return COVERS_DIR.stat().st_mtime_ns
+    except OSError:
+        return None
+
 
 def panel_send(user: str, partner: str) -> None:
     stage = st.session_state.send_stage
@@ -25,13 +41,12 @@ def panel_send(user: str, partner: str) -> None:
         st.markdown(
             f'<div class="sc-alert sc-alert-ok">'
             f'✓ Stego-images delivered to <b>{partner}</b>\'s inbox.<br>'
-            f'Symmetric keys are RSA-sealed. Only {partner} can open.</div>',
+            f'Symmetric keys are KEM-sealed. Only {partner} can open.</div>',
             unsafe_allow_html=True,
         )
         if st.button("↩ Compose New Message", width="stretch", key="btn_new_msg"):
-            st.session_state.send_stage   = None
-            st.session_state.stego_paths  = []
-            st.session_state.enc_sym_keys = None
+            st.session_state.send_stage    = None
+            st.session_state.staged_bundle = None
             st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
         return
@@ -52,7 +67,7 @@ def _compose_form(user: str, partner: str) -> None:
 
     if not keys_gen:
         st.markdown(
-            '<div class="sc-alert sc-alert-warn">⚠ Generate your RSA keys first (Key Status panel).</div>',
+            '<div class="sc-alert sc-alert-warn">⚠ Generate your keys first (Key Status panel).</div>',
             unsafe_allow_html=True,
         )
     if not partner_ready:
@@ -77,8 +92,21 @@ def _compose_form(user: str, partner: str) -> None:
         key="up_covers",
         help="Upload one image per message chunk. More images = finer distribution.",
     )
+    # Reruns (every keystroke) only stat the library directory; the full
+    # scan runs when it changes and again when the message is sent
+    stamp   = None if uploaded else _library_stamp()
+    library = _library_size(str(COVERS_DIR), stamp) if stamp is not None else 0
+    if library:
+        st.caption(f"No uploads: covers will be picked from the library ({library} image(s)).")
+    depth = st.select_slider(
+        "Embedding depth (bits per channel)",
+        options=list(SUPPORTED_DEPTHS),
+        value=1,
+        key="sel_depth",
+        help="Higher depth fits more data per image at the cost of more visible noise.",
+    )
 
-    can_send = bool(message and message.strip() and uploaded)
+    can_send = bool(message and message.strip() and (uploaded or library))
 
     if st.button(
         "🔐 ENCRYPT & TRANSMIT",
@@ -86,7 +114,7 @@ def _compose_form(user: str, partner: str) -> None:
         disabled=not can_send,
         key="btn_encrypt",
     ):
-        _do_encrypt_stage(user, partner, message.strip(), uploaded, public_keys[partner])
+        _do_encrypt_stage(user, partner, message.strip(), uploaded, public_keys[partner], depth)
 
 
 def _do_encrypt_stage(
@@ -94,50 +122,76 @@ def _do_encrypt_stage(
     partner:         str,
     message:         str,
     uploaded_files,
-    partner_pub_pem: str,
+    partner_key:     dict,
+    depth:           int = 1,
 ) -> None:
-    """Run the full tri-hybrid encryption + LSB stego pipeline and stage results."""
-    num_parts = len(uploaded_files)
+    """
+    Run the full tri-hybrid encryption + LSB stego pipeline and stage results.
+    Without uploads, the covers are picked from a fresh scan of the library.
+    """
+    if uploaded_files:
+        covers     = uploaded_files
+        capacities = None   # read from the uploads below
+    else:
+        try:
+            entries = select_covers(
+                scan_covers(COVERS_DIR), len(message.encode("utf-8")), payload_overhead(CIPHER_SUITE), depth
+            )
+        except ValueError as exc:
+            st.error(str(exc))
+            return
+        covers     = [entry["path"] for entry in entries]
+        capacities = [entry_capacity(entry, depth) for entry in entries]
+    num_parts = len(covers)
 
     inner_key = get_random_bytes(32)   # ChaCha20
     outer_key = get_random_bytes(16)   # ASCON-128
     ctr_key   = get_random_bytes(16)   # AES-128-CTR (seq IDs)
 
-    enc_sym_keys = rsa_encrypt_sym_keys(inner_key, outer_key, ctr_key, partner_pub_pem)
-
-    stage_sub   = Path(tempfile.mkdtemp(dir=STAGING_DIR))
-    cover_paths = []
-    for i, uf in enumerate(uploaded_files):
-        suffix = Path(uf.name).suffix or ".png"
-        p = stage_sub / f"cover_{i}{suffix}"
-        p.write_bytes(uf.read())
-        cover_paths.append(str(p))
+    enc_sym_keys = encapsulate_sym_keys(
+        inner_key, outer_key, ctr_key, partner_key["pem"], partner_key["kem"], partner
+    )
 
-    stego_dir = stage_sub / "stego"
-    stego_dir.mkdir()
+    stego_dir = new_job()
 
     try:
         with st.spinner(f"🔐 Encrypting & embedding into {num_parts} image(s)…"):
+            if capacities is None:
+                capacities = [cover_capacity(uf.getvalue(), depth) for uf in uploaded_files]
             payloads    = split_and_prepare_payloads(
-                message, num_parts, inner_key, outer_key, ctr_key
+                message, num_parts, inner_key, outer_key, ctr_key,
+                capacities=capacities,
+                wire_format=WIRE_FORMAT_V2,
+                compress=True,
+                suite=CIPHER_SUITE,
+                max_workers=CRYPTO_WORKERS,
+                pool=CRYPTO_POOL,
+            )
+            used        = [i for i, payload in enumerate(payloads) if payload is not None]
+            results     = embed_batch(
+                [covers[i] for i in used],
+                [payloads[i][0] + payloads[i][1] for i in used],
+                depth=depth,
+                max_workers=STEGO_WORKERS,
             )
-            stego_paths = []
-            for i, (enc_seq_id, enc_content) in enumerate(payloads):
-                full_data = enc_seq_id + enc_content
-                out_path  = str(stego_dir / f"stego_{i}.png")
-                ok = embed_data(cover_paths[i], full_data, out_path)
-                if ok:
-                    stego_paths.append(out_path)
-                else:
-                    st.error(f"Stego embedding failed for image {i + 1}.")
-                    return
-
-        st.session_state.stego_paths  = stego_paths
-        st.session_state.enc_sym_keys = enc_sym_keys
-        st.session_state.send_stage   = "preview"
+            failed = [used[i] + 1 for i, (_, err) in enumerate(results) if err]
+            if failed:
+                release_job(stego_dir)
+                st.error(f"Stego embedding failed for image(s) {', '.join(map(str, failed))}.")
+                return
+            bundle_path = write_bundle(
+                stego_dir / "message.sgb",
+                [stego_png for stego_png, _ in results],
+                enc_sym_keys,
+            )
+
+        st.session_state.staging_job   = str(stego_dir)
+        st.session_state.staged_bundle = str(bundle_path)
+        st.session_state.send_stage    = "preview"
         st.rerun()
 
     except Exception as exc:
+        release_job(stego_dir)
         st.error(f"Encryption pipeline error: {exc}")
 
 
@@ -151,22 +205,20 @@ def _send_preview(partner: str) -> None:
         unsafe_allow_html=True,
     )
 
-    stego_paths = st.session_state.stego_paths
-    n_cols = min(len(stego_paths), 4)
-    cols   = st.columns(n_cols)
-    for i, path in enumerate(stego_paths):
-        with cols[i % n_cols]:
-            try:
-                img = Image.open(path)
-                buf = BytesIO()
-                img.save(buf, format="PNG")
-                st.image(buf.getvalue(), width="stretch")
-                st.markdown(
-                    f'<div class="sc-img-label">STEGO_{i + 1}.PNG</div>',
-                    unsafe_allow_html=True,
-                )
-            except Exception:
-                st.warning(f"Could not preview stego_{i}.png")
+    with BundleReader(st.session_state.staged_bundle) as bundle:
+        names  = bundle.stego_names()
+        n_cols = min(len(names), 4)
+        cols   = st.columns(n_cols)
+        for i, name in enumerate(names):
+            with cols[i % n_cols]:
+                try:
+                    st.image(bundle.read(name), width="stretch")
+                    st.markdown(
+                        f'<div class="sc-img-label">STEGO_{i + 1}.PNG</div>',
+                        unsafe_allow_html=True,
+                    )
+                except Exception:
+                    st.warning(f"Could not preview {name}")
 
     st.markdown('<hr class="sc-divider">', unsafe_allow_html=True)
 
@@ -176,25 +228,22 @@ def _send_preview(partner: str) -> None:
             _commit_to_inbox(partner)
     with c2:
         if st.button("✗ CANCEL", width="stretch", key="btn_cancel_send"):
-            st.session_state.send_stage   = None
-            st.session_state.stego_paths  = []
-            st.session_state.enc_sym_keys = None
+            release_job(st.session_state.staging_job)
+            st.session_state.staging_job   = None
+            st.session_state.send_stage    = None
+            st.session_state.staged_bundle = None
             st.rerun()
 
 
 def _commit_to_inbox(partner: str) -> None:
-    """Copy staged stego-images and the RSA-sealed key blob to partner's inbox."""
-    inbox = INBOX_DIR / partner
-
-    for f in inbox.iterdir():
-        f.unlink(missing_ok=True)
-
-    for src in st.session_state.stego_paths:
-        shutil.copy2(src, inbox / Path(src).name)
-
-    (inbox / "keys.bin").write_bytes(st.session_state.enc_sym_keys)
+    """Publish the staged message bundle to partner's inbox in one atomic step."""
+    deliver_bundle(
+        partner, st.session_state.username, st.session_state.staged_bundle, get_suite(CIPHER_SUITE).name
+    )
+    # The inbox holds its own link to the bundle; the workspace can go
+    release_job(st.session_state.staging_job)
 
-    st.session_state.send_stage   = "sent"
-    st.session_state.stego_paths  = []
-    st.session_state.enc_sym_keys = None
+    st.session_state.staging_job   = None
+    st.session_state.send_stage    = "sent"
+    st.session_state.staged_bundle = None
     st.rerun()